@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+SERVICES = ("sts", "organizations", "lambda")
+
+
+def rss_kb():
+    """Returns the peak resident set size of this process in KB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def build_clients(mode, accounts, region):
+    """
+    Creates one session per simulated account plus its sts/organizations/lambda clients.
+    Dummy credentials are used; creating clients makes no API calls.
+
+    Args:
+        mode: "plain" for a boto3.Session per account, "shared" for hap.aws.new_session.
+        accounts: The number of simulated accounts.
+        region: The region to create the clients in.
+
+    Returns:
+        A tuple of seconds per account and RSS growth in KB per account.
+    """
+    if mode == "shared":
+        from hap.aws import new_session
+
+        def make_session(index):
+            return new_session(region=region, aws_access_key_id=f"AKIA{index:016d}", aws_secret_access_key="secret")
+    else:
+        import boto3
+
+        def make_session(index):
+            return boto3.Session(region_name=region, aws_access_key_id=f"AKIA{index:016d}", aws_secret_access_key="secret")
+
+    # Warm up imports and the first model load so only the per-account cost is measured
+    warm = make_session(0)
+    for service in SERVICES:
+        warm.client(service)
+
+    clients = []
+    rss_before = rss_kb()
+    start = time.perf_counter()
+    for index in range(1, accounts + 1):
+        session = make_session(index)
+        clients.extend(session.client(service) for service in SERVICES)
+    elapsed = time.perf_counter() - start
+    return elapsed / accounts, (rss_kb() - rss_before) / accounts
+
+
+def main():
+    """
+    Benchmarks client creation per account with a plain boto3.Session per account (before)
+    and with sessions on the shared botocore core (after). Each mode runs in its own process
+    so the RSS numbers do not overlap.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark per-account session and client creation.")
+    parser.add_argument("--accounts", type=int, default=100, help="number of simulated accounts (default: 100)")
+    parser.add_argument("--region", default="us-east-1", help="region for the clients (default: us-east-1)")
+    parser.add_argument("--mode", choices=("plain", "shared"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        seconds, kb = build_clients(args.mode, args.accounts, args.region)
+        print(f"{seconds * 1000:.2f} {kb:.1f}")
+        return
+
+    print(f"{args.accounts} accounts x {len(SERVICES)} clients ({', '.join(SERVICES)})")
+    print(f"{'mode':<28}{'ms / account':>14}{'RSS KB / account':>18}")
+    for mode, label in (("plain", "boto3.Session (before)"), ("shared", "shared botocore core (after)")):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--accounts", str(args.accounts), "--region", args.region],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        print(f"{label:<28}{float(output[0]):>14.2f}{float(output[1]):>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,42 @@
 #!/usr/bin/env python3
 
-from hap.aws import AWS
-from botocore.exceptions import ClientError
+import argparse
+
+from hap.profiling import add_profile_argument
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Delete non-exempt AWS Config rules in every configured region.")
+    add_profile_argument(parser, "cleanup-rules")
+    return parser.parse_args()
 
 def main():
     """
     Main function to check and delete AWS Config rules that are not exempt and not in the process of being deleted.
     For each region, it retrieves the Config rules, filters them based on the state and exempt prefixes,
     and deletes the rules along with any associated RemediationConfiguration.
+    Regions that are throttled or time out, or whose circuit breaker opens, are skipped and listed at the end.
     """
+    args = parse_args()
+
+    # boto3 is only imported once the arguments are parsed, so --help stays fast
+    from hap.aws import AWS, discover_regions
+    from hap.resilience import CircuitOpenError, breaker_for, is_transient
+    from botocore.exceptions import ClientError
+
     # Initialize the AWS class for the 'config' service
-    aws = AWS(service="config")
+    aws = AWS(service="config", profile_file=args.profile)
     
-    # Iterate over all regions
-    for region in aws.regions:
+    # Skip configured regions that are not enabled for this account
+    with aws.phase("region_discovery"):
+        enabled = discover_regions(aws.session)
+    regions = [region for region in aws.regions if enabled is None or region in enabled]
+    if len(regions) < len(aws.regions):
+        aws.logger.info(f"Skipping regions not enabled: {sorted(set(aws.regions) - set(regions))}")
+
+    # Iterate over all enabled regions
+    unavailable = []
+    for region in regions:
         aws.logger.info(f"Checking Config rules in {region}")
         matched_rules = []
         
@@ -25,39 +48,60 @@ def main():
 
         try:
             # Paginate through all Config rules in the current region
-            for page in paginator.paginate():
-                matched_rules.extend([
-                    rule['ConfigRuleName'] 
-                    for rule in page['ConfigRules'] 
-                    # Filter out rules that are in the process of being deleted and exempt rules
-                    if rule['ConfigRuleState'] != "DELETING" and not any(rule['ConfigRuleName'].startswith(prefix) for prefix in aws.config['exempt_rule_prefixes'])
-                ])     
+            with breaker_for(client).guard(), aws.phase("listing", region=region):
+                for page in paginator.paginate():
+                    matched_rules.extend([
+                        rule['ConfigRuleName'] 
+                        for rule in page['ConfigRules'] 
+                        # Filter out rules that are in the process of being deleted and exempt rules
+                        if rule['ConfigRuleState'] != "DELETING" and not any(rule['ConfigRuleName'].startswith(prefix) for prefix in aws.config['exempt_rule_prefixes'])
+                    ])     
+        except CircuitOpenError as e:
+            unavailable.append(region)
+            aws.logger.warning(f"{region}: {e}")
+            continue
         except Exception as e:
+            if is_transient(e):
+                # The listing is incomplete, so do not delete from a partial list
+                unavailable.append(region)
+                aws.logger.warning(f"{region}: Throttled or timed out listing Config rules: {e}")
+                continue
             print(f"Error in region {region}: {e}")
         
         aws.logger.info(f"Matched rules in {region}: [{len(matched_rules)}]")
         aws.logger.debug(f"Matched rules in {region}: {matched_rules}")
 
         if matched_rules:
-            for rule in matched_rules:
-                aws.logger.info(f"{region}: Deleting Config rule: {rule}")
-                try:
-                    # Attempt to delete any associated RemediationConfiguration first
-                    client.delete_remediation_configuration(ConfigRuleName=rule)
-                    aws.logger.info(f"{region}: Deleted RemediationConfiguration for rule: {rule}")
-                except ClientError as e:
-                    if e.response['Error']['Code'] == 'NoSuchRemediationConfigurationException':
-                        aws.logger.info(f"{region}: No RemediationConfiguration found for rule: {rule}")
-                    else:
-                        aws.logger.error(f"{region}: Error deleting RemediationConfiguration for rule: {rule}: {e}")
-                        continue
-
-                try:
-                    # Delete the Config rule
-                    client.delete_config_rule(ConfigRuleName=rule)
-                    aws.logger.info(f"{region}: Deleted Config rule: {rule}")
-                except ClientError as e:
-                    aws.logger.error(f"{region}: Error deleting Config rule: {rule}: {e}")
+            with aws.phase("deleting", region=region, rules=len(matched_rules)):
+                for rule in matched_rules:
+                    aws.logger.info(f"{region}: Deleting Config rule: {rule}")
+                    try:
+                        # Attempt to delete any associated RemediationConfiguration first
+                        with breaker_for(client).guard():
+                            client.delete_remediation_configuration(ConfigRuleName=rule)
+                        aws.logger.info(f"{region}: Deleted RemediationConfiguration for rule: {rule}")
+                    except CircuitOpenError:
+                        unavailable.append(region)
+                        break
+                    except ClientError as e:
+                        if e.response['Error']['Code'] == 'NoSuchRemediationConfigurationException':
+                            aws.logger.info(f"{region}: No RemediationConfiguration found for rule: {rule}")
+                        else:
+                            aws.logger.error(f"{region}: Error deleting RemediationConfiguration for rule: {rule}: {e}")
+                            continue
+
+                    try:
+                        # Delete the Config rule
+                        aws.try_aws_action(client, "delete_config_rule", ConfigRuleName=rule)
+                        aws.logger.info(f"{region}: Deleted Config rule: {rule}")
+                    except CircuitOpenError:
+                        unavailable.append(region)
+                        break
+                    except ClientError as e:
+                        aws.logger.error(f"{region}: Error deleting Config rule: {rule}: {e}")
+
+    if unavailable:
+        aws.logger.warning(f"Regions skipped after throttling or timeouts, re-run to finish them: {unavailable}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,26 +1,36 @@
 #!/usr/bin/env python3
 
+import argparse
 import logging
-import logging.config
+import os
+import subprocess
+import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import boto3
-import tomli
-from rich import box
-from rich.console import Console
-from rich.table import Table
+from hap.log import configure_logging, env_flag
+from hap.profiling import add_profile_argument, get_profiler
+from hap.shard import load_partials, new_run_id, parse_shard, parse_workers, select_shard, shard_of, write_partial
+
+# rich, boto3 (through hap.aws, hap.resilience and hap.scanner), the config parsers and the
+# inventory store are imported by the functions that use them, so --help and the store
+# reports do not pay for what they never touch.
 
 
 # Load configuration from config.toml
 def load_config():
-    """Loads configuration from the config.toml file."""
-    with open('config.toml', 'rb') as f:
-        return tomli.load(f)
+    """
+    Loads configuration from the config.toml file through the shared config cache.
+    The result is a read-only view (mappings and tuples) that every worker thread shares.
+    """
+    from hap import config as config_cache
+
+    return config_cache.load('config.toml')
 
 def assume_role(session, role_arn, role_session_name='AWSAFT-Session'):
     """
     Assumes an IAM role and returns a new boto3 session with the role's credentials.
+    The session is built on the shared botocore core, so service models are not reloaded per account.
 
     Args:
         session: The current boto3 session.
@@ -30,13 +40,15 @@ def assume_role(session, role_arn, role_session_name='AWSAFT-Session'):
     Returns:
         A new boto3 session with the assumed role's credentials.
     """
+    from hap.aws import new_session
+
     sts_client = session.client('sts')
     response = sts_client.assume_role(
         RoleArn=role_arn,
         RoleSessionName=role_session_name
     )
     credentials = response['Credentials']
-    return boto3.Session(
+    return new_session(
         aws_access_key_id=credentials['AccessKeyId'],
         aws_secret_access_key=credentials['SecretAccessKey'],
         aws_session_token=credentials['SessionToken']
@@ -53,7 +65,9 @@ def query_active_accounts(payer_profile_name, ignored_account_ids):
     Returns:
         A sorted list of active account IDs.
     """
-    payer_session = boto3.Session(profile_name=payer_profile_name)
+    from hap.aws import new_session
+
+    payer_session = new_session(payer_profile_name)
     organizations_client = payer_session.client('organizations')
     paginator = organizations_client.get_paginator('list_accounts')
     all_account_ids = []
@@ -95,66 +109,81 @@ def format_region_name(region):
                  .replace("central", "c") \
                  .replace("-", "")
 
-def count_lambdas_in_region(session, region, lambda_suffix):
+def load_rules(config):
     """
-    Counts the number of Lambda functions with a matching suffix in a specific region.
+    Builds the scan rules: the configured Lambda suffix plus any [scan.rules.<name>] tables.
 
     Args:
-        session: The boto3 session.
-        region: The AWS region name.
-        lambda_suffix: The suffix to match against Lambda function names.
-
-    Returns:
-        A tuple containing the region name and the count of matching Lambda functions.
-    """
-    lambda_client = session.client('lambda', region_name=region)
-    lambdas_count = 0
-    paginator = lambda_client.get_paginator('list_functions')
-    for page in paginator.paginate():
-        for func in page['Functions']:
-            if func['FunctionName'].endswith(lambda_suffix):
-                lambdas_count += 1
-    return region, lambdas_count
-
-def list_lambdas(account_id, lambda_suffix, regions, session):   
-    """
-    Lists Lambda functions with a matching suffix in all specified regions.
-
-    Args:
-        account_id: The ID of the account.
-        lambda_suffix: The suffix to match against Lambda function names.
-        regions: A list of AWS region names.
-        session: The boto3 session.
+        config: The loaded configuration from config.toml.
 
     Returns:
-        A dictionary containing the count of matching Lambda functions in each region.
+        A list of Rule instances, the Lambda suffix rule (named "lambda") first.
     """
-    lambdas_count = {} 
-    with ThreadPoolExecutor() as executor:
-        futures = [executor.submit(count_lambdas_in_region, session, region, lambda_suffix) for region in regions]
-        for future in as_completed(futures):
-            region, count = future.result()
-            lambdas_count[region] = count
-            logger.debug(f"Account ID: {account_id}; Region: {region}; Matching Lambdas: {count}")
-
-    return lambdas_count
+    from hap.scanner import Rule
+
+    rules = [Rule("lambda", "lambda", suffixes=config['aws']['lambda_suffix'])]
+    for name, rule_config in config.get('scan', {}).get('rules', {}).items():
+        rules.append(Rule.from_config(name, rule_config))
+    return rules
+
+def parse_args():
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(description="Find Lambda functions with a matching suffix, and resources matching any [scan.rules], across accounts and regions.")
+    add_profile_argument(parser, "find-lambdas")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--shard", type=parse_shard, metavar="i/N", help="scan only shard i (0-based) of N and write a partial result file")
+    mode.add_argument("--workers", type=parse_workers, metavar="N", help="run N shard processes on this host, then merge their results")
+    mode.add_argument("--merge", metavar="DIR", help="build the summary table from the partial result files in DIR")
+    mode.add_argument("--runs", action="store_true", help="list the runs recorded in the inventory store")
+    mode.add_argument("--diff", nargs=2, type=int, metavar=("OLD", "NEW"), help="show resources added and removed between two stored runs (-1 is the latest)")
+    mode.add_argument("--trend", metavar="ACCOUNT_ID", help="show matching resource counts per region for an account across stored runs")
+    parser.add_argument("--rule", default="lambda", help="rule to report on with --diff and --trend (default: lambda, the lambda_suffix rule)")
+    parser.add_argument("--output", default="shards", metavar="DIR", help="directory for partial result files (default: shards)")
+    parser.add_argument("--run-id", metavar="ID", help="ID stamped on partial result files with --shard and required of them with --merge, so partials left by other runs are not merged")
+    parser.add_argument("--store", default=os.getenv("INVENTORY_FILE"), metavar="PATH", help="SQLite inventory store to record runs in and report from (env: INVENTORY_FILE)")
+    return parser.parse_args()
 
 def main():
     """
     Main function to orchestrate the Lambda discovery process.
 
     1. Loads configuration.
-    2. Determines target account IDs.
-    3. Sets up the output table.
-    4. Processes each account concurrently to find matching Lambdas.
-    5. Prints the results table.
+    2. Determines target account IDs, narrowed to one shard with --shard.
+    3. Processes each account concurrently, evaluating every scan rule in a single pass.
+    4. Prints one results table per rule, or writes a partial result file with --shard.
     """
-    logging.config.fileConfig('logging.conf')
-    global logger
+    args = parse_args()
+    # Worker threads only enqueue records; a listener thread does the formatting and I/O
+    configure_logging('logging.conf', queue_mode=True, json_format=env_flag('LOGGING_JSON'))
+    global logger, profiler
     logger = logging.getLogger(__name__)
+    profiler = get_profiler(args.profile)
+
+    if args.runs or args.diff or args.trend:
+        if not args.store:
+            sys.exit("Reports need an inventory store, pass --store or set INVENTORY_FILE")
+        report(args)
+        return
+    if args.merge:
+        sys.exit(0 if merge_shards(args.merge, args.store, args.run_id) else 1)
+    if args.workers:
+        run_id = new_run_id()
+        failed_shards = run_shards(args.workers, args.output, run_id, args.profile)
+        sys.exit(0 if merge_shards(args.output, args.store, run_id, failed_shards, args.workers) else 1)
+
+    from hap.aws import RegionCache
+    from hap.resilience import configure as configure_resilience
+    from hap.resilience import tripped
+    from hap.scanner import Scanner
 
     logger.info('Starting Lambda discovery')
-    config = load_config()
+    with profiler.phase("config_load"):
+        config = load_config()
+    configure_resilience(**config['aws'].get('resilience', {}))
+    rules = load_rules(config)
+    scanner = Scanner(rules)
+    region_cache = RegionCache(config['aws'].get('region_cache_file', '.region-cache.json'), config['aws'].get('region_cache_ttl', 86400))
+    logger.info(f"Scanning with rules: {[rule.name for rule in rules]}")
 
     # Determine target account IDs
     if config['aws'].get('account_ids'):
@@ -162,73 +191,327 @@ def main():
         logger.info(f"Using specified account IDs [{len(active_account_ids)}]: {active_account_ids}")
     else:
         # If not specified, query active accounts
-        active_account_ids = query_active_accounts(config['aws']['payer_profile_name'], config['aws'].get('ignored_account_ids', []))
+        with profiler.phase("query_accounts"):
+            active_account_ids = query_active_accounts(config['aws']['payer_profile_name'], config['aws'].get('ignored_account_ids', []))
         logger.info(f"Discovered active account IDs [{len(active_account_ids)}]: {active_account_ids}")
 
-    # Prepare the output table
-    console = Console()
-    table = Table(title=f"Matching Lambda Summary, {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", show_header=True, header_style="bold magenta", box=box.ROUNDED)
-    table.add_column("Account ID", justify="center", style="dim", width=12)
-    table.add_column("Account Name", justify="left", style="dim") # Left justify and no truncation
-    
-    # Dynamically add region columns
-    for region in config['aws']['regions']:
-        table.add_column(format_region_name(region), justify="center", style="dim")
+    if args.shard:
+        index, count = args.shard
+        active_account_ids = select_shard(active_account_ids, index, count)
+        logger.info(f"Shard {index}/{count}: scanning {len(active_account_ids)} accounts")
 
     # Process each account concurrently
+    results = []
     with ThreadPoolExecutor() as executor:
         futures = []
         for account_id in active_account_ids:
-            futures.append(executor.submit(process_account, account_id, config, table))
+            futures.append(executor.submit(process_account, account_id, config, scanner, region_cache))
         for future in as_completed(futures):
-            future.result()  # Get the result to propagate any exceptions
+            results.append(future.result())
+
+    if args.shard:
+        path = write_partial(args.output, index, count, results, {"regions": config['aws']['regions'], "lambda_suffix": config['aws']['lambda_suffix'], "rules": [rule.name for rule in rules]}, args.run_id)
+        logger.info(f"Wrote shard {index}/{count} results to {path}")
+    # Losing the cache update only costs rediscovery next run, never the scan results
+    try:
+        region_cache.save()
+    except OSError as e:
+        logger.warning(f"Could not save the region cache {region_cache.path}: {e}")
+    if args.shard:
+        return
+
+    if args.store:
+        record_run(args.store, results, config['aws']['lambda_suffix'])
+
+    print_summary(results, config['aws']['regions'], [rule.name for rule in rules])
+    for breaker in tripped():
+        logger.warning(f"Circuit breaker for {breaker.service} in {breaker.region} opened {breaker.trips} time(s), now {breaker.state}")
+    if unavailable_accounts(results):
+        sys.exit(1)
+
+def run_shards(workers, output, run_id, profile=None):
+    """
+    Runs every shard as a separate process on this host and waits for them to finish.
+
+    Args:
+        workers: The number of shard processes.
+        output: The directory the shards write their partial results to.
+        run_id: The run ID the shards stamp on their partial result files.
+        profile: The profile prefix of this run; each shard profiles to <prefix>-shard-<i> (optional).
+
+    Returns:
+        The indexes of the shards that exited with an error.
+    """
+    logger.info(f"Starting {workers} shard processes writing to {output}, run {run_id}")
+    # Shards get their profile prefix on the command line, not from the inherited PROFILE_FILE
+    env = {key: value for key, value in os.environ.items() if key != 'PROFILE_FILE'}
+    processes = []
+    for index in range(workers):
+        command = [sys.executable, os.path.abspath(__file__), "--shard", f"{index}/{workers}", "--output", output, "--run-id", run_id]
+        if profile:
+            command += ["--profile", f"{profile}-shard-{index}"]
+        processes.append(subprocess.Popen(command, env=env))
+    failed = []
+    for index, process in enumerate(processes):
+        if process.wait() != 0:
+            logger.error(f"Shard {index}/{workers} exited with {process.returncode}")
+            failed.append(index)
+    return failed
+
+def merge_shards(directory, store=None, run_id=None, failed_shards=(), shard_count=None):
+    """
+    Merges the partial result files of a sharded run and prints the summary table.
+    Missing shards, shards that exited with an error and shards with failed accounts or
+    unavailable targets are listed so only those need re-running.
+
+    Args:
+        directory: The directory holding the partial result files.
+        store: The inventory store to record the merged run in (optional).
+        run_id: Only merge partials stamped with this run ID (optional).
+        failed_shards: The indexes of shard processes that exited with an error.
+        shard_count: The number of shards started, so every shard can be named when none wrote results (optional).
 
-    # Print the results table
-    console.print(table)
+    Returns:
+        True if every shard is present and exited cleanly and every account was scanned completely.
+    """
+    run_option = f" --run-id {run_id}" if run_id else ""
+    try:
+        count, meta, results, missing = load_partials(directory, run_id)
+    except RuntimeError as e:
+        logger.error(str(e))
+        for index in range(shard_count or 0):
+            logger.error(f"Shard {index}/{shard_count} is incomplete, re-run it with --shard {index}/{shard_count} --output {directory}{run_option}")
+        return False
+    if store:
+        record_run(store, results, meta.get('lambda_suffix'))
+    print_summary(results, meta['regions'], meta['rules'])
+
+    failed = sorted({result['account_id'] for result in results if result['error']})
+    if failed:
+        logger.error(f"Accounts with errors [{len(failed)}]: {failed}")
+    incomplete = set(missing) | set(failed_shards) | {shard_of(account_id, count) for account_id in failed + unavailable_accounts(results)}
+    for index in sorted(incomplete):
+        logger.error(f"Shard {index}/{count} is incomplete, re-run it with --shard {index}/{count} --output {directory}{run_option}")
+    return not incomplete
+
+def unavailable_accounts(results):
+    """
+    Lists the accounts with targets left unscanned after throttling, timeouts or an open circuit.
+
+    Args:
+        results: The per-account results returned by process_account.
+
+    Returns:
+        A sorted list of the affected account IDs.
+    """
+    accounts = sorted({result['account_id'] for result in results if result.get('unavailable')})
+    if accounts:
+        logger.error(f"Accounts with unavailable targets [{len(accounts)}], re-run to complete them: {accounts}")
+    return accounts
+
+def record_run(store, results, lambda_suffix):
+    """
+    Records a run's results in the inventory store.
+
+    Args:
+        store: The path of the SQLite inventory store.
+        results: The per-account results returned by process_account.
+        lambda_suffix: The suffix the run matched, stored as the run label.
+    """
+    from hap.inventory import Inventory
+
+    with profiler.phase("recording"):
+        inventory = Inventory(store)
+        try:
+            run_id = inventory.start_run(label=lambda_suffix)
+            for result in results:
+                # Accounts that failed have no matches but are still recorded with their error
+                for rule_name, resources in (result['matches'] or {"lambda": {}}).items():
+                    inventory.record_account(run_id, result['account_id'], rule_name, resources, result['account_name'], result['error'])
+        finally:
+            inventory.close()
+    logger.info(f"Recorded run {run_id} with {len(results)} accounts in {store}")
+
+def report(args):
+    """
+    Answers --runs, --diff and --trend from the inventory store without calling AWS.
+
+    Args:
+        args: The parsed command line arguments.
+    """
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
+    from hap.inventory import Inventory
+
+    inventory = Inventory(args.store)
+    try:
+        if args.runs:
+            table = Table(title=f"Stored Runs, {args.store}", header_style="bold magenta", box=box.ROUNDED)
+            for column in ("Run", "Started", "Suffix", "Accounts", "Errors", "Resources"):
+                table.add_column(column, justify="right" if column in ("Run", "Accounts", "Errors", "Resources") else "left")
+            for row in inventory.runs():
+                table.add_row(*[str(value if value is not None else "-") for value in row])
+        elif args.diff:
+            old_run, new_run = (inventory.resolve_run(run) for run in args.diff)
+            table = Table(title=f"Changes for rule {args.rule}, run {old_run} -> {new_run}", header_style="bold magenta", box=box.ROUNDED)
+            for column in ("Change", "Account ID", "Region", "Resource"):
+                table.add_column(column)
+            changes = inventory.diff(old_run, new_run, args.rule)
+            for change, style in (("added", "green"), ("removed", "red")):
+                for account_id, region, _, resource_id in changes[change]:
+                    table.add_row(change, account_id, region, resource_id, style=style)
+        else:
+            table = Table(title=f"Trend for rule {args.rule}, {args.trend}", header_style="bold magenta", box=box.ROUNDED)
+            rows = inventory.trend(args.trend, args.rule)
+            regions = sorted({region for _, _, region, _ in rows})
+            table.add_column("Run", justify="right")
+            table.add_column("Started")
+            for region in regions:
+                table.add_column(format_region_name(region), justify="center")
+            counts = {}
+            for run_id, started_at, region, count in rows:
+                counts.setdefault((run_id, started_at), {})[region] = count
+            for (run_id, started_at), by_region in counts.items():
+                table.add_row(str(run_id), started_at, *[str(by_region[region]) if region in by_region else "N/A" for region in regions])
+    except RuntimeError as e:
+        sys.exit(str(e))
+    finally:
+        inventory.close()
+    Console().print(table)
+
+def print_summary(results, regions, rule_names):
+    """
+    Prints one results table per rule, then the targets skipped after throttling or timeouts.
 
-def process_account(account_id, config, table):
+    Args:
+        results: The per-account results returned by process_account.
+        regions: A list of AWS region names, one column each.
+        rule_names: The rules to print a table for.
+    """
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
+    with profiler.phase("rendering"):
+        for rule_name in rule_names:
+            Console().print(build_table(results, regions, rule_name))
+        unavailable = [(result['account_id'], *target) for result in results for target in result.get('unavailable', [])]
+        if unavailable:
+            table = Table(title="Unavailable Targets (throttled, timed out or circuit open)", header_style="bold yellow", box=box.ROUNDED)
+            for column in ("Account ID", "Service", "Region", "Reason"):
+                table.add_column(column)
+            for row in sorted(unavailable):
+                table.add_row(*row, style="yellow")
+            Console().print(table)
+
+def build_table(results, regions, rule_name):
     """
-    Processes a single account to find matching Lambdas and update the table.
+    Builds the summary table of one rule from per-account results.
+
+    Args:
+        results: The per-account results returned by process_account.
+        regions: A list of AWS region names, one column each.
+        rule_name: The rule whose counts are shown.
+
+    Returns:
+        The Rich Table instance.
+    """
+    from rich import box
+    from rich.table import Table
+
+    table = Table(title=f"Matching Summary ({rule_name}), {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", show_header=True, header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("Account ID", justify="center", style="dim", width=12)
+    table.add_column("Account Name", justify="left", style="dim") # Left justify and no truncation
+
+    # Dynamically add region columns
+    for region in regions:
+        table.add_column(format_region_name(region), justify="center", style="dim")
+
+    for result in sorted(results, key=lambda result: result['account_id']):
+        if result['error']:
+            table.add_row(result['account_id'], "Error", *["N/A" for _ in regions], style="red")
+            continue
+
+        # Add counts to the row, format based on count value
+        row = [result['account_id'], f"[bold white]{result['account_name']}[/]"]
+        unavailable = {region for _, region, _ in result.get('unavailable', [])}
+        for region in regions:
+            counts = result['counts'].get(rule_name, {})
+            if region not in counts and region in unavailable:
+                row.append("[bold yellow]skip[/]") # Throttled, timed out or circuit open, see Unavailable Targets
+                continue
+            if region not in counts:
+                row.append("[dim grey]n/a[/]") # Region not enabled or denied, not scanned
+                continue
+            count = counts[region]
+            row.append(f"[bold blue]{count}[/]" if count > 0 else "[dim grey]-[/]") # Highlight > 0, use "-" for 0
+        table.add_row(*row)
+
+    return table
+
+def process_account(account_id, config, scanner, region_cache):
+    """
+    Processes a single account, evaluating every scan rule in one pass per service and region.
+    Regions that are not enabled or are denied for the account are skipped before fan-out.
+    Targets that stay throttled or time out are reported as unavailable instead of failing the account.
 
     Args:
         account_id: The ID of the account to process.
         config: The loaded configuration from config.toml.
-        table: The Rich Table instance to update with the results.
+        scanner: The Scanner holding the rules to evaluate.
+        region_cache: The RegionCache of usable regions per account.
+
+    Returns:
+        A dictionary with the account ID, account name, matching resources and counts per rule and region,
+        the unavailable [service, region, reason] targets and error, if any.
     """
-    payer_session = boto3.Session(profile_name=config['aws']['payer_profile_name'])
+    from hap.aws import discover_regions, new_session
+    from hap.scanner import count_matrix
+
+    result = {'account_id': account_id, 'account_name': None, 'matches': {}, 'counts': {}, 'unavailable': [], 'error': None}
     try:
-        account_name = get_account_name(account_id, payer_session)
-        row = [account_id, f"[bold white]{account_name}[/]" ]
-
-        # Assume roles for access
-        session = boto3.Session()
-        current_account_id = session.client('sts').get_caller_identity()['Account']
-
-        # Assume AWSAFTAdmin role in the management account
-        if current_account_id in config['aws'].get('management_account_ids', []):
-            admin_role_arn = f"arn:aws:iam::{current_account_id}:role/{config['aws']['management_role_name']}"
-            session = assume_role(session, admin_role_arn)
-            logger.debug(f"Assumed AWSAFTAdmin role in management account: {current_account_id}")
-
-        # Assume AWSAFTExecution role in the target account
-        execution_role_arn = f"arn:aws:iam::{account_id}:role/{config['aws']['execution_role_name']}"
-        session = assume_role(session, execution_role_arn)
-        logger.debug(f"Assumed AWSAFTExecution role in target account: {account_id}")
-
-        # Get Lambda counts for all regions
-        lambdas_count_dict = list_lambdas(account_id, config['aws']['lambda_suffix'], config['aws']['regions'], session)
+        with profiler.phase("session_setup", account_id=account_id):
+            payer_session = new_session(config['aws']['payer_profile_name'])
+            result['account_name'] = get_account_name(account_id, payer_session)
+
+            # Assume roles for access
+            session = new_session()
+            current_account_id = session.client('sts').get_caller_identity()['Account']
+
+        with profiler.phase("role_assumption", account_id=account_id):
+            # Assume AWSAFTAdmin role in the management account
+            if current_account_id in config['aws'].get('management_account_ids', []):
+                admin_role_arn = f"arn:aws:iam::{current_account_id}:role/{config['aws']['management_role_name']}"
+                session = assume_role(session, admin_role_arn)
+                logger.debug("Assumed AWSAFTAdmin role in management account: %s", current_account_id)
+
+            # Assume AWSAFTExecution role in the target account
+            execution_role_arn = f"arn:aws:iam::{account_id}:role/{config['aws']['execution_role_name']}"
+            session = assume_role(session, execution_role_arn)
+            logger.debug("Assumed AWSAFTExecution role in target account: %s", account_id)
+
+        with profiler.phase("region_discovery", account_id=account_id):
+            regions = region_cache.usable_regions(account_id, config['aws']['regions'], lambda: discover_regions(session))
+        skipped = [region for region in config['aws']['regions'] if region not in regions]
+        if skipped:
+            logger.info(f"Account ID: {account_id}; Skipping regions not enabled or denied: {skipped}")
+
+        # List each service once per region and evaluate all rules against it
+        result['matches'] = scanner.scan_account(session, regions, result['unavailable'])
+        unavailable = {region for _, region, _ in result['unavailable']}
+        for region in regions:
+            if region not in unavailable and not any(region in by_region for by_region in result['matches'].values()):
+                logger.warning(f"Account ID: {account_id}; Region {region} denied, skipping it until the region cache expires")
+                region_cache.mark_denied(account_id, region)
+        result['counts'] = count_matrix(result['matches'])
+        logger.debug("Account ID: %s; Matches: %s", account_id, result['counts'])
     except Exception as e:
         logger.error(f"Error processing account {account_id}: {e}")
-        row = [account_id, "Error", *["N/A" for _ in config['aws']['regions']]]  
-        table.add_row(*row, style="red")  # Add the error row and return
-        return
-
-    # Add counts to the row, format based on count value
-    for region in config['aws']['regions']:
-        count = lambdas_count_dict.get(region, 0)
-        row.append(f"[bold blue]{count}[/]" if count > 0 else "[dim grey]-[/]") # Highlight > 0, use "-" for 0
+        result['error'] = str(e)
 
-    table.add_row(*row) 
+    return result
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,12 +1,199 @@
 #!/usr/bin/env python3
 
+import json
+import os
+import tempfile
+import threading
+import time
 from functools import lru_cache, wraps
-from typing import Optional
+from typing import Callable, Iterable, List, Optional, Set
 
 import boto3
+import botocore.session
 from botocore.exceptions import (BotoCoreError, ClientError,
                                  NoCredentialsError, PartialCredentialsError)
 from hap.base import Base
+from hap.resilience import CircuitOpenError, breaker_for, client_config, is_transient
+from hap.resilience import configure as configure_resilience
+
+# Components that only depend on botocore's bundled data, not on credentials or profile.
+# Sharing them means service models and endpoint data are loaded and parsed once per process.
+SHARED_COMPONENTS = ("data_loader", "response_parser_factory")
+SHARED_INTERNAL_COMPONENTS = ("endpoint_resolver", "exceptions_factory")
+
+# Error codes a regional endpoint returns when the region is not enabled for the account, so
+# the account's credentials are not valid there. Targets failing with these are skipped until
+# the cache expires. Regions that discovery found not enabled are never scanned at all.
+REGION_DENIED_CODES = frozenset(
+    {
+        "AuthFailure",
+        "InvalidClientTokenId",
+        "OptInRequired",
+        "UnrecognizedClientException",
+    }
+)
+# AccessDenied only counts as a denied region when an SCP denies it (e.g. on aws:RequestedRegion).
+# Otherwise it usually means a missing IAM permission, which must show up as an error.
+ACCESS_DENIED_CODES = frozenset({"AccessDenied", "AccessDeniedException"})
+SCP_DENY_MESSAGE = "explicit deny in a service control policy"
+
+_core = None
+_core_lock = threading.Lock()
+
+
+class _SharedCoreSession(boto3.Session):
+    """boto3 session on the shared loader, which shared_core() already gave boto3's resource model path."""
+
+    def _setup_loader(self):
+        self._loader = self._session.get_component("data_loader")
+
+
+def shared_core() -> botocore.session.Session:
+    """Return the process-wide botocore session whose loader and resolvers every session reuses."""
+    global _core
+    with _core_lock:
+        if _core is None:
+            _core = botocore.session.get_session()
+            for name in SHARED_COMPONENTS:
+                _core.get_component(name)
+            for name in SHARED_INTERNAL_COMPONENTS:
+                _core._get_internal_component(name)
+            # Added once here, not per session, so concurrent new_session calls never race on it
+            _core.get_component("data_loader").search_paths.append(os.path.join(os.path.dirname(boto3.__file__), "data"))
+        return _core
+
+
+def new_session(
+    profile: Optional[str] = None,
+    region: Optional[str] = None,
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None,
+    aws_session_token: Optional[str] = None,
+) -> boto3.Session:
+    """
+    Create a boto3 session on the shared botocore core.
+    Only the credentials (and profile/region) are per session; the data loader, endpoint
+    resolver, parsed service models and exception classes are shared, so building a session
+    per account does not reload and reparse the JSON models from disk.
+    Clients use the configured retry mode (adaptive by default) and timeouts.
+    """
+    core = shared_core()
+    session = botocore.session.Session(profile=profile)
+    for name in SHARED_COMPONENTS:
+        session.register_component(name, core.get_component(name))
+    for name in SHARED_INTERNAL_COMPONENTS:
+        session._register_internal_component(name, core._get_internal_component(name))
+    if aws_access_key_id:
+        session.set_credentials(aws_access_key_id, aws_secret_access_key, aws_session_token)
+    session.set_default_client_config(client_config())
+    return _SharedCoreSession(botocore_session=session, region_name=region)
+
+
+def is_region_denied(error: Exception) -> bool:
+    """Return True if an AWS error means the region is not enabled for the account or is denied by an SCP."""
+    if not isinstance(error, ClientError):
+        return False
+    code = error.response.get("Error", {}).get("Code")
+    message = error.response.get("Error", {}).get("Message", "")
+    return code in REGION_DENIED_CODES or (code in ACCESS_DENIED_CODES and SCP_DENY_MESSAGE in message.lower())
+
+
+def discover_regions(session: boto3.Session) -> Optional[Set[str]]:
+    """
+    Return the regions enabled for the session's account, or None if they cannot be listed.
+    Uses account:ListRegions opt-in status, falling back to ec2:DescribeRegions, which only
+    returns enabled regions.
+    """
+    try:
+        paginator = session.client("account", region_name="us-east-1").get_paginator("list_regions")
+        return {
+            region["RegionName"]
+            for page in paginator.paginate(RegionOptStatusContains=["ENABLED", "ENABLED_BY_DEFAULT"])
+            for region in page["Regions"]
+        }
+    except (ClientError, BotoCoreError):
+        pass
+    try:
+        regions = session.client("ec2", region_name="us-east-1").describe_regions(AllRegions=False)["Regions"]
+        return {region["RegionName"] for region in regions}
+    except (ClientError, BotoCoreError):
+        return None
+
+
+class RegionCache:
+    """
+    Per-account cache of usable regions with a TTL, optionally persisted to a JSON file.
+    An entry holds the enabled regions discovered for the account (None if discovery failed)
+    and the regions that were denied when scanned.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 86400) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._entries = self._read() if path else {}
+
+    def _read(self) -> dict:
+        """Read the persisted entries, ignoring a missing or unreadable file."""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _entry(self, account_id: str, discover: Callable[[], Optional[Set[str]]]) -> dict:
+        """Return the account's entry, discovering its regions if there is none or it has expired."""
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry and time.time() - entry["checked"] < self.ttl:
+                return entry
+        enabled = discover()
+        entry = {"checked": time.time(), "enabled": sorted(enabled) if enabled is not None else None, "denied": []}
+        with self._lock:
+            self._entries[account_id] = entry
+            self._dirty.add(account_id)
+        return entry
+
+    def usable_regions(
+        self, account_id: str, regions: Iterable[str], discover: Callable[[], Optional[Set[str]]]
+    ) -> List[str]:
+        """Return the given regions minus those not enabled or denied for the account."""
+        entry = self._entry(account_id, discover)
+        return [
+            region
+            for region in regions
+            if (entry["enabled"] is None or region in entry["enabled"]) and region not in entry["denied"]
+        ]
+
+    def mark_denied(self, account_id: str, region: str) -> None:
+        """Skip a region for the account until its entry expires."""
+        with self._lock:
+            entry = self._entries.setdefault(account_id, {"checked": time.time(), "enabled": None, "denied": []})
+            if region not in entry["denied"]:
+                entry["denied"].append(region)
+            self._dirty.add(account_id)
+
+    def save(self) -> None:
+        """
+        Write the entries updated by this process into the cache file. Entries written by
+        other processes (e.g. other shards) in the meantime are kept.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            entries = self._read()
+            entries.update({account_id: self._entries[account_id] for account_id in self._dirty})
+            # A temporary file per writer, so concurrent shards never share one
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entries, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._dirty.clear()
 
 
 def handle_aws_exceptions(func):
@@ -20,8 +207,14 @@ def handle_aws_exceptions(func):
         except PartialCredentialsError as e:
             self.logger.error(f"Partial AWS credentials: {e}")
             raise
+        except CircuitOpenError as e:
+            self.logger.warning(f"Skipped {func.__name__}: {e}")
+            raise
         except (BotoCoreError, ClientError) as e:
-            self.logger.error(f"AWS error in {func.__name__}: {e}")
+            if is_transient(e):
+                self.logger.warning(f"AWS throttled or timed out in {func.__name__}: {e}")
+            else:
+                self.logger.error(f"AWS error in {func.__name__}: {e}")
             raise
 
     return wrapper
@@ -36,6 +229,7 @@ class AWS(Base):
         """Initialize the AWS class with a specified profile and service."""
         super().__init__(*args, **kwargs)
         self.logger.info("Initializing AWS class")
+        configure_resilience(**self.config_data.get("aws", {}).get("resilience", {}))
         self.session = self.get_session(profile)
         self.service = service
         self.region = region or self.get_region()
@@ -73,11 +267,26 @@ class AWS(Base):
     @lru_cache
     def get_session(self, profile: Optional[str] = None) -> boto3.Session:
         """Create and return a boto3 session."""
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        self.account_id = session.client("sts").get_caller_identity()["Account"]
+        with self.phase("session_setup", profile=profile):
+            session = new_session(profile)
+            self.account_id = session.client("sts").get_caller_identity()["Account"]
         self.logger.info(f"Created boto3 session for: {self.account_id}")
         return session
 
+    @handle_aws_exceptions
+    def assume_role(
+        self, role_arn: str, session: Optional[boto3.Session] = None, role_session_name: str = "AWSAFT-Session"
+    ) -> boto3.Session:
+        """Assume an IAM role and return a session on the shared botocore core with its credentials."""
+        sts_client = (session or self.session).client("sts")
+        with self.phase("role_assumption", role_arn=role_arn):
+            credentials = sts_client.assume_role(RoleArn=role_arn, RoleSessionName=role_session_name)["Credentials"]
+        return new_session(
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretAccessKey"],
+            aws_session_token=credentials["SessionToken"],
+        )
+
     @lru_cache
     def get_client(self, service: str, region: Optional[str] = None) -> boto3.client:
         """Return a boto3 client for the specified service, optionally in a specific region."""
@@ -105,12 +314,22 @@ class AWS(Base):
         return None
 
     def _load_config(self, section: str) -> None:
-        """Load configuration for the specified section and set attributes."""
+        """
+        Load configuration for the specified section and set attributes.
+        Values are the cached read-only views (tuples and mappings), so they are shared, not copied.
+        """
         config = self.config_data.get(section, {})
         for key, value in config.items():
-            setattr(self, key, value.copy() if isinstance(value, list) else value)
+            setattr(self, key, value)
         self.logger.info(f"Loaded {section} configuration into attributes")
 
+    def reload_config(self):
+        """Reload the configuration file and refresh the attributes taken from it."""
+        super().reload_config()
+        configure_resilience(**self.config_data.get("aws", {}).get("resilience", {}))
+        self._load_config("aws")
+        self._load_config("aft")
+
     def check_account(
         self,
         account_type: str = "management",
@@ -152,20 +371,31 @@ class AWS(Base):
         if not method:
             self.logger.error(f"Action {action} is not available for service {self.service}")
             raise AttributeError(f"Invalid action: {action}")
-        response = method(**kwargs)
+        with breaker_for(self.client).guard():
+            response = method(**kwargs)
         self.logger.info(f"Performed action {action} on service {self.service}")
         return response
 
     def try_aws_action(self, client, action: str, **kwargs) -> dict:
-        """Helper function to attempt an AWS action with error logging."""
+        """
+        Helper function to attempt an AWS action with error logging.
+        The call goes through the circuit breaker of the client's service and region.
+        """
         try:
-            return getattr(client, action)(**kwargs)
+            with breaker_for(client).guard():
+                return getattr(client, action)(**kwargs)
         except NoCredentialsError as e:
             self.logger.error(f"Missing AWS credentials during {action}: {e}")
             raise
         except PartialCredentialsError as e:
             self.logger.error(f"Partial AWS credentials during {action}: {e}")
             raise
+        except CircuitOpenError as e:
+            self.logger.warning(f"Skipped {action}: {e}")
+            raise
         except (ClientError, BotoCoreError) as e:
-            self.logger.error(f"Error during {action}: {e}")
+            if is_transient(e):
+                self.logger.warning(f"Throttled or timed out during {action}: {e}")
+            else:
+                self.logger.error(f"Error during {action}: {e}")
             raise
@@ -1,19 +1,25 @@
 #!/usr/bin/env python3
 
-import json
-import logging.config
+import logging
 import os
 from typing import Optional
 
-import tomli
-import yaml
+from hap import config
+from hap.log import configure_logging, env_flag
+from hap.profiling import get_profiler
 
 
 class Base:
-    def __init__(self, config_file: Optional[str] = None, logging_file: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        config_file: Optional[str] = None,
+        logging_file: Optional[str] = None,
+        profile_file: Optional[str] = None,
+    ) -> None:
         """
-        Initialize the Base class with optional configuration and logging file paths.
-        If no file paths are provided, default values are used.
+        Initialize the Base class with optional configuration, logging and profile file paths.
+        If no file paths are provided, default values are used. Profiling is off unless a
+        profile prefix is given here or through PROFILE_FILE.
         """
         self.config_file = config_file or os.getenv(
             "CONFIG_FILE", os.path.join(os.path.dirname(__file__), "..", "config.toml")
@@ -22,42 +28,50 @@ class Base:
             "LOGGING_FILE", os.path.join(os.path.dirname(__file__), "logging.conf")
         )
 
+        self.profile_file = profile_file or os.getenv("PROFILE_FILE")
+        self.profiler = get_profiler(self.profile_file)
+
         self.setup_logging()
         self.logger.debug("Initializing Base class")
+        if self.profiler.enabled:
+            self.logger.info(f"Profiling enabled, writing {self.profiler.output_prefix}.prof and .trace.json")
 
-        self.config_data = self.load_config()
+        with self.profiler.phase("config_load", config_file=self.config_file):
+            self.config_data = self.load_config()
+
+        watch_interval = os.getenv("CONFIG_WATCH_INTERVAL")
+        if watch_interval:
+            self.watch_config(float(watch_interval))
+
+    def phase(self, name: str, **args):
+        """Context manager timing a named phase of the run when profiling is enabled."""
+        return self.profiler.phase(name, **args)
 
     def load_config(self):
         """
         Load configuration from the specified file.
-        Supports TOML, JSON, and YAML formats.
+        Supports TOML, JSON, and YAML formats. The parsed file is cached per process and
+        shared as a read-only view until the file changes on disk.
         """
-        file_extension = os.path.splitext(self.config_file)[1].lower()
-
         try:
-            with open(self.config_file, "rb") as f:
-                if file_extension == ".toml":
-                    return tomli.load(f)
-                elif file_extension == ".json":
-                    return json.load(f)
-                elif file_extension in (".yaml", ".yml"):
-                    return yaml.safe_load(f)
-                else:
-                    raise RuntimeError(f"Unsupported config file format: {file_extension}")
-
+            return config.load(self.config_file)
         except FileNotFoundError:
             self.logger.error(f"{self.config_file} not found.")
             raise RuntimeError(f"{self.config_file} not found.")
-        except (tomli.TOMLDecodeError, json.JSONDecodeError, yaml.YAMLError) as e:
+        except config.PARSE_ERRORS as e:
             self.logger.error(f"Failed to parse {self.config_file}: {e}")
             raise RuntimeError(f"Failed to parse {self.config_file}: {e}")
 
-    def setup_logging(self):
+    def setup_logging(self, queue_mode: Optional[bool] = None, json_format: Optional[bool] = None):
         """
         Set up logging configuration from the specified logging file.
+        The file is applied once per process. LOGGING_QUEUE=1 moves handler I/O onto a
+        QueueListener thread and LOGGING_JSON=1 switches the handlers to JSON lines.
         """
+        queue_mode = env_flag("LOGGING_QUEUE") if queue_mode is None else queue_mode
+        json_format = env_flag("LOGGING_JSON") if json_format is None else json_format
         try:
-            logging.config.fileConfig(self.logging_file)
+            configure_logging(self.logging_file, queue_mode=queue_mode, json_format=json_format)
             self.logger = logging.getLogger(self.__class__.__name__)
             self.logger.debug(f"Logging configured using {self.logging_file}")
         except Exception as e:
@@ -71,6 +85,14 @@ class Base:
         self.logger.info(f"Reloading configuration from {self.config_file}")
         self.config_data = self.load_config()
 
+    def watch_config(self, interval: float = 5.0):
+        """
+        Reload the configuration whenever the file changes on disk.
+        One daemon thread polls each file; this object is held weakly so it can still be collected.
+        """
+        self.logger.info(f"Watching {self.config_file} for changes every {interval}s")
+        config.watch(self.config_file, self.reload_config, interval)
+
     def update_logging_config(self, new_logging_file: Optional[str] = None):
         """
         Update the logging configuration during runtime.
@@ -78,7 +100,12 @@ class Base:
         """
         new_logging_file = new_logging_file or self.logging_file
         try:
-            logging.config.fileConfig(new_logging_file)
+            configure_logging(
+                new_logging_file,
+                queue_mode=env_flag("LOGGING_QUEUE"),
+                json_format=env_flag("LOGGING_JSON"),
+                force=True,
+            )
             self.logger.debug(f"Logging updated using {new_logging_file}")
         except Exception as e:
             self.logger.error(f"Failed to update logging configuration: {e}")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import runpy
+import sys
+from typing import List, Optional
+
+# Nothing heavier than the standard library is imported here: boto3, rich, yaml and
+# requests are only loaded by the script behind the chosen subcommand.
+# The scripts are not packaged: they run from the repository checkout the hap package is
+# installed from (editable install), or from SNT_ROOT.
+_ROOT = os.environ.get("SNT_ROOT") or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COMMANDS = {
+    "find-lambdas": (
+        os.path.join("aws", "find-lambdas.py"),
+        "Count resources matching scan rules (Lambda suffix by default) across accounts and regions.",
+    ),
+    "cleanup-rules": (
+        os.path.join("aws", "cleanup-rules.py"),
+        "Delete non-exempt AWS Config rules in every configured region.",
+    ),
+    "get-teams": (
+        os.path.join("github", "get-teams.py"),
+        "Export GitHub team repos, maintainers and members as YAML.",
+    ),
+    "update-environments": (
+        os.path.join("snowflakes", "update-environments.py"),
+        "Create GitHub environments and domain variables from domains.json.",
+    ),
+    "parse-domains": (
+        os.path.join("snowflakes", "parse-domains-from-tfvars.sh"),
+        "Convert custom_domains in domains.tfvars to domains.json.",
+    ),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the top-level parser. Subcommand options are parsed by the scripts themselves."""
+    parser = argparse.ArgumentParser(prog="snt", description="shawns-nice-tools command line.")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+    for name, (_, description) in COMMANDS.items():
+        subparsers.add_parser(name, help=description, description=description, add_help=False)
+    return parser
+
+
+def run(command: str, args: List[str]) -> None:
+    """
+    Run the script behind a subcommand as __main__ with the remaining arguments.
+    The working directory is switched to the script's directory, where the scripts
+    expect their config and data files.
+    """
+    script = os.path.join(_ROOT, COMMANDS[command][0])
+    if not os.path.isfile(script):
+        sys.exit(
+            f"snt: {script} not found. snt runs the scripts from a shawns-nice-tools checkout: "
+            "install it with `poetry install` from the checkout, or set SNT_ROOT to the checkout's path."
+        )
+    sys.argv = [script, *args]
+    os.chdir(os.path.dirname(script))
+    runpy.run_path(script, run_name="__main__")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for the `snt` console script."""
+    args, rest = build_parser().parse_known_args(argv)
+    run(args.command, rest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import weakref
+from types import MappingProxyType
+from typing import Callable, Dict, Optional
+
+import tomli
+import yaml
+
+PARSE_ERRORS = (tomli.TOMLDecodeError, json.JSONDecodeError, yaml.YAMLError)
+
+_lock = threading.Lock()
+_cache: Dict[str, tuple] = {}
+_watchers: Dict[str, "ConfigWatcher"] = {}
+
+
+def freeze(value):
+    """Return a read-only view of parsed config: mappings become MappingProxyType and lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def parse(raw: bytes, file_extension: str) -> dict:
+    """Parse TOML, JSON or YAML content."""
+    if file_extension == ".toml":
+        return tomli.loads(raw.decode("utf-8"))
+    elif file_extension == ".json":
+        return json.loads(raw)
+    elif file_extension in (".yaml", ".yml"):
+        return yaml.safe_load(raw)
+    else:
+        raise RuntimeError(f"Unsupported config file format: {file_extension}")
+
+
+def _stat_key(path: str) -> tuple:
+    """Return the (mtime, size) pair used to notice a changed file without reading it."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load(config_file: str):
+    """
+    Return the parsed config for a file from the process-wide cache.
+    The file is only read again when its mtime or size changes, and only reparsed
+    when its content hash changes. Every caller gets the same immutable view.
+    """
+    path = os.path.abspath(config_file)
+    with _lock:
+        key = _stat_key(path)
+        cached = _cache.get(path)
+        if cached and cached[0] == key:
+            return cached[2]
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if cached and cached[1] == digest:
+            _cache[path] = (key, digest, cached[2])
+            return cached[2]
+
+        data = freeze(parse(raw, os.path.splitext(path)[1].lower()) or {})
+        _cache[path] = (key, digest, data)
+        return data
+
+
+def clear_cache() -> None:
+    """Drop every cached config."""
+    with _lock:
+        _cache.clear()
+
+
+class ConfigWatcher(threading.Thread):
+    """Daemon thread polling a config file and calling subscribers when it changes."""
+
+    def __init__(self, path: str, interval: float) -> None:
+        super().__init__(name=f"ConfigWatcher-{os.path.basename(path)}", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._last_key = _stat_key(path)
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """
+        Call `callback` after every change. Bound methods are held weakly so a watched
+        object can still be garbage collected.
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        with self._callbacks_lock:
+            self._callbacks.append(ref)
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def check(self) -> None:
+        """Notify subscribers if the file changed since the last check."""
+        try:
+            key = _stat_key(self.path)
+        except FileNotFoundError:
+            self.logger.warning(f"{self.path} disappeared, keeping the last loaded configuration")
+            return
+        if key == self._last_key:
+            return
+        self._last_key = key
+        self.logger.info(f"{self.path} changed, reloading")
+
+        with self._callbacks_lock:
+            live = [(ref, ref()) for ref in self._callbacks]
+            self._callbacks = [ref for ref, callback in live if callback is not None]
+        for _, callback in live:
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f"Config reload failed, keeping the last loaded configuration: {e}")
+
+
+def watch(config_file: str, callback: Callable[[], None], interval: Optional[float] = None) -> ConfigWatcher:
+    """Subscribe `callback` to changes of a config file, starting one watcher thread per file."""
+    path = os.path.abspath(config_file)
+    with _lock:
+        watcher = _watchers.get(path)
+        if watcher is None:
+            watcher = ConfigWatcher(path, interval or 5.0)
+            watcher.start()
+            _watchers[path] = watcher
+    watcher.subscribe(callback)
+    return watcher
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    account_id TEXT NOT NULL,
+    account_name TEXT,
+    error TEXT,
+    PRIMARY KEY (run_id, account_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scanned_regions (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    account_id TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    region TEXT NOT NULL,
+    PRIMARY KEY (run_id, account_id, resource_type, region)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS resources (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    account_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, account_id, region, resource_type, resource_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scanned_regions_by_account ON scanned_regions (account_id, resource_type, run_id);
+CREATE INDEX IF NOT EXISTS resources_by_account ON resources (account_id, resource_type, run_id, region);
+"""
+
+# Resources of a run in the regions where their resource type was scanned successfully in both
+# runs being compared, so an account or listing that failed in one run does not show up as
+# everything added or removed.
+_DIFF_QUERY = """
+SELECT r.account_id, r.region, r.resource_type, r.resource_id
+FROM resources r
+JOIN scanned_regions s
+  ON s.run_id = :other AND s.account_id = r.account_id AND s.resource_type = r.resource_type AND s.region = r.region
+WHERE r.run_id = :run AND (:resource_type IS NULL OR r.resource_type = :resource_type)
+EXCEPT
+SELECT account_id, region, resource_type, resource_id
+FROM resources
+WHERE run_id = :other
+ORDER BY 1, 2, 3, 4
+"""
+
+
+class Inventory:
+    """SQLite store of scan results keyed by (run, account, region, resource)."""
+
+    def __init__(self, path: str) -> None:
+        """Open (and create if needed) the inventory database at `path`."""
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def start_run(self, label: Optional[str] = None, started_at: Optional[str] = None) -> int:
+        """Create a run and return its ID."""
+        started_at = started_at or datetime.now().isoformat(timespec="seconds")
+        with self.connection:
+            cursor = self.connection.execute("INSERT INTO runs (started_at, label) VALUES (?, ?)", (started_at, label))
+        return cursor.lastrowid
+
+    def record_account(
+        self,
+        run_id: int,
+        account_id: str,
+        resource_type: str,
+        resources: Dict[str, Iterable[str]],
+        account_name: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record one resource type of an account in a run. `resources` maps each region where
+        the resource type was listed successfully to the IDs of the resources found there.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO accounts (run_id, account_id, account_name, error) VALUES (?, ?, ?, ?)",
+                (run_id, account_id, account_name, error),
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO scanned_regions (run_id, account_id, resource_type, region) VALUES (?, ?, ?, ?)",
+                [(run_id, account_id, resource_type, region) for region in resources],
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO resources (run_id, account_id, region, resource_type, resource_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, account_id, region, resource_type, resource_id)
+                    for region, resource_ids in resources.items()
+                    for resource_id in resource_ids
+                ],
+            )
+
+    def runs(self) -> List[tuple]:
+        """
+        Return (run_id, started_at, label, accounts, failed accounts, resources) for every run, oldest first.
+        A resource matched by several rules is counted once.
+        """
+        return self.connection.execute(
+            """
+            SELECT r.run_id, r.started_at, r.label,
+                   (SELECT COUNT(*) FROM accounts a WHERE a.run_id = r.run_id),
+                   (SELECT COUNT(*) FROM accounts a WHERE a.run_id = r.run_id AND a.error IS NOT NULL),
+                   (SELECT COUNT(*) FROM (SELECT DISTINCT account_id, region, resource_id
+                                          FROM resources s WHERE s.run_id = r.run_id))
+            FROM runs r
+            ORDER BY r.run_id
+            """
+        ).fetchall()
+
+    def resolve_run(self, reference: int) -> int:
+        """Return a run ID; negative references count back from the latest run (-1 is the latest)."""
+        if reference >= 0:
+            row = self.connection.execute("SELECT run_id FROM runs WHERE run_id = ?", (reference,)).fetchone()
+        else:
+            row = self.connection.execute(
+                "SELECT run_id FROM runs ORDER BY run_id DESC LIMIT 1 OFFSET ?", (-reference - 1,)
+            ).fetchone()
+        if row is None:
+            raise RuntimeError(f"Run {reference} not found in {self.path}")
+        return row[0]
+
+    def diff(self, old_run: int, new_run: int, resource_type: Optional[str] = None) -> Dict[str, List[tuple]]:
+        """Return the (account_id, region, resource_type, resource_id) rows added and removed between two runs."""
+        old_run, new_run = self.resolve_run(old_run), self.resolve_run(new_run)
+        return {
+            "added": self.connection.execute(
+                _DIFF_QUERY, {"run": new_run, "other": old_run, "resource_type": resource_type}
+            ).fetchall(),
+            "removed": self.connection.execute(
+                _DIFF_QUERY, {"run": old_run, "other": new_run, "resource_type": resource_type}
+            ).fetchall(),
+        }
+
+    def trend(self, account_id: str, resource_type: Optional[str] = None) -> List[tuple]:
+        """
+        Return (run_id, started_at, region, count) for an account across every run it was scanned in.
+        Regions where the resource type was not listed successfully in a run are left out of that run.
+        """
+        return self.connection.execute(
+            """
+            SELECT s.run_id, r.started_at, s.region, COUNT(x.resource_id)
+            FROM scanned_regions s
+            JOIN runs r ON r.run_id = s.run_id
+            LEFT JOIN resources x
+              ON x.run_id = s.run_id AND x.account_id = s.account_id
+             AND x.resource_type = s.resource_type AND x.region = s.region
+            WHERE s.account_id = :account_id AND (:resource_type IS NULL OR s.resource_type = :resource_type)
+            GROUP BY s.run_id, s.region
+            ORDER BY s.run_id, s.region
+            """,
+            {"account_id": account_id, "resource_type": resource_type},
+        ).fetchall()
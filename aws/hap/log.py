@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import atexit
+import copy
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Optional
+
+_lock = threading.Lock()
+_configured_file: Optional[str] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return the record as a JSON document."""
+        entry = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for an in-process queue. Records are never pickled, so only the message is
+    merged on the logging thread; exc_info stays on the record and the listener's formatters
+    render it, with the same output as without the queue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return a copy of the record with its message merged and its arguments dropped."""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+def configure_logging(
+    logging_file: str, queue_mode: bool = False, json_format: bool = False, force: bool = False
+) -> bool:
+    """
+    Configure the root logger from a logging file once per process.
+    Returns False when the file is already in place and force is not set, so building
+    many objects does not tear down and rebuild the handlers each time.
+    """
+    global _configured_file
+    with _lock:
+        if _configured_file == logging_file and not force:
+            return False
+        _stop_listener()
+        logging.config.fileConfig(logging_file)
+        root = logging.getLogger()
+        if json_format:
+            for handler in root.handlers:
+                handler.setFormatter(JsonFormatter(datefmt="%Y-%m-%d %H:%M:%S"))
+        raise_level_to_handlers(root)
+        if queue_mode:
+            _start_listener(root)
+        _configured_file = logging_file
+        return True
+
+
+def env_flag(name: str) -> bool:
+    """Return True when the environment variable is set to a truthy value."""
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+
+def raise_level_to_handlers(logger: logging.Logger) -> None:
+    """
+    Raise the logger level to the lowest level any of its handlers accepts.
+    Messages no handler would emit are then dropped by the logger's own level check,
+    before a record is built or a handler lock is taken.
+    """
+    if not logger.handlers:
+        return
+    lowest = min(handler.level for handler in logger.handlers)
+    if lowest > logger.level:
+        logger.setLevel(lowest)
+
+
+def _start_listener(root: logging.Logger) -> None:
+    """Move the root handlers behind a queue so formatting and I/O run on a listener thread."""
+    global _listener
+    log_queue = queue.SimpleQueue()
+    handlers = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_LocalQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    """Flush and stop the queue listener, if one is running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(_stop_listener)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# cProfile only hooks the thread that enables it. Before 3.12 each worker thread can be
+# bootstrapped with its own profiler. From 3.12 cProfile is built on sys.monitoring, which
+# allows one profiler per interpreter, so enabling a second one raises "ValueError: Another
+# profiling tool is already active". There only the main thread is profiled and worker time
+# is visible through the phase trace.
+_PER_THREAD_PROFILING = sys.version_info < (3, 12)
+
+
+class Profiler:
+    """Wrap a run in cProfile and record phase timings as Chrome trace events."""
+
+    def __init__(self, output_prefix: Optional[str] = None) -> None:
+        """
+        Initialize the profiler. Nothing is recorded unless an output prefix is given;
+        results are written to `<prefix>.prof` and `<prefix>.trace.json`.
+        """
+        self.output_prefix = output_prefix
+        self.enabled = bool(output_prefix)
+        self.events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._profiles = []
+        self._running = False
+
+    def start(self) -> None:
+        """Start profiling and register the results to be written on interpreter exit."""
+        if not self.enabled or self._running:
+            return
+        self._running = True
+        self._enable_profile()
+        if _PER_THREAD_PROFILING:
+            threading.setprofile(self._bootstrap_thread)
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop profiling and write the `.prof` and `.trace.json` files."""
+        if not self._running:
+            return
+        self._running = False
+        if _PER_THREAD_PROFILING:
+            threading.setprofile(None)
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        for profile in profiles:
+            profile.disable()
+
+        directory = os.path.dirname(self.output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(f"{self.output_prefix}.prof")
+
+        with open(f"{self.output_prefix}.trace.json", "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    @contextmanager
+    def phase(self, name: str, **args):
+        """Time the enclosed block and record it as a complete ("X") trace event."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            event = {
+                "name": name,
+                "cat": "phase",
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def _enable_profile(self) -> None:
+        """Create and enable a cProfile profiler for the calling thread."""
+        profile = cProfile.Profile()
+        profile.enable()
+        with self._lock:
+            self._profiles.append(profile)
+
+    def _bootstrap_thread(self, frame, event, arg) -> None:
+        """Profile hook run once in each new thread to hand it over to its own cProfile profiler."""
+        sys.setprofile(None)
+        if self._running:
+            self._enable_profile()
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler(output_prefix: Optional[str] = None) -> Profiler:
+    """
+    Return the process-wide profiler, starting it the first time an output prefix is given.
+    Later calls share the same profiler so every object built during a run records into it.
+    """
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None or (output_prefix and not _profiler.enabled):
+            _profiler = Profiler(output_prefix)
+            _profiler.start()
+        return _profiler
+
+
+def add_profile_argument(parser, name: str) -> None:
+    """Add the shared `--profile [PREFIX]` switch to a script's argument parser."""
+    default_prefix = f"profile-{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=default_prefix,
+        default=os.getenv("PROFILE_FILE"),
+        metavar="PREFIX",
+        help=f"write <PREFIX>.prof and <PREFIX>.trace.json (default prefix: {default_prefix}; env: PROFILE_FILE)",
+    )
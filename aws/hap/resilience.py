@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from botocore.config import Config
+from botocore.exceptions import (ClientError, ConnectionClosedError, ConnectTimeoutError,
+                                 EndpointConnectionError, ReadTimeoutError)
+
+# Error codes AWS returns when a caller is being throttled or the endpoint is briefly unavailable.
+# Botocore has already retried these by the time they surface, so each one counts as a failure.
+THROTTLING_CODES = frozenset(
+    {
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottledException",
+        "TooManyRequestsException",
+        "ProvisionedThroughputExceededException",
+        "TransactionInProgressException",
+        "RequestLimitExceeded",
+        "BandwidthLimitExceeded",
+        "LimitExceededException",
+        "RequestThrottled",
+        "SlowDown",
+        "PriorRequestNotComplete",
+        "EC2ThrottledException",
+    }
+)
+TRANSIENT_CODES = frozenset({"RequestTimeout", "RequestTimeoutException", "ServiceUnavailable", "InternalError"})
+TIMEOUT_ERRORS = (ConnectTimeoutError, ReadTimeoutError, EndpointConnectionError, ConnectionClosedError)
+
+# Defaults for the [aws.resilience] config table. AWS_RETRY_MODE / AWS_MAX_ATTEMPTS replace them if set.
+# max_attempts counts the first call, like AWS_MAX_ATTEMPTS.
+DEFAULTS = {
+    "retry_mode": os.getenv("AWS_RETRY_MODE", "adaptive"),
+    "max_attempts": int(os.getenv("AWS_MAX_ATTEMPTS", "5")),
+    "connect_timeout": 10,
+    "read_timeout": 30,
+    "failure_threshold": 3,
+    "cooldown": 30.0,
+    "max_defer_wait": 60.0,
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a (service, region) whose circuit breaker is open."""
+
+    def __init__(self, service: str, region: str, retry_in: float) -> None:
+        super().__init__(f"Circuit open for {service} in {region}, retrying in {retry_in:.0f}s")
+        self.service = service
+        self.region = region
+        self.retry_in = retry_in
+
+
+def is_transient(error: Exception) -> bool:
+    """Return True if an AWS error is throttling, a timeout or a server-side failure."""
+    if isinstance(error, TIMEOUT_ERRORS):
+        return True
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in THROTTLING_CODES or code in TRANSIENT_CODES or status >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one (service, region). It opens after `failure_threshold` consecutive
+    throttles or timeouts and rejects calls for `cooldown` seconds. After the cooldown one call
+    is let through as a probe (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        region: str,
+        failure_threshold: int = DEFAULTS["failure_threshold"],
+        cooldown: float = DEFAULTS["cooldown"],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.service = service
+        self.region = region
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self._opened_at + self.cooldown - self.clock()
+            if self.state == OPEN and retry_in <= 0:
+                self.state = HALF_OPEN  # This caller is the probe, everyone else waits for its outcome
+                return
+            raise CircuitOpenError(self.service, self.region, max(retry_in, 0))
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        """Count a throttle or timeout, opening the circuit at the threshold or after a failed probe."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.trips += 1
+                self._opened_at = self.clock()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Run the block through the breaker. Only throttles and timeouts count as failures."""
+        self.allow()
+        try:
+            yield
+        except Exception as e:
+            if is_transient(e):
+                self.record_failure()
+            else:
+                self.record_success()  # The endpoint answered, so it is healthy
+            raise
+        self.record_success()
+
+
+_settings = dict(DEFAULTS)
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def configure(**settings) -> None:
+    """
+    Apply the [aws.resilience] settings. Changing the breaker settings replaces the existing
+    breakers; the retry settings apply to clients created from then on.
+    """
+    unknown = set(settings) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown resilience settings: {sorted(unknown)}")
+    with _lock:
+        if any(_settings[key] != value for key, value in settings.items()):
+            _settings.update(settings)
+            _breakers.clear()
+
+
+def reset() -> None:
+    """Restore the default settings and close every breaker."""
+    with _lock:
+        _settings.clear()
+        _settings.update(DEFAULTS)
+        _breakers.clear()
+
+
+def get_setting(name: str):
+    """Return the current value of one resilience setting."""
+    with _lock:
+        return _settings[name]
+
+
+def client_config() -> Config:
+    """Return the botocore client config with the configured retry mode and timeouts."""
+    with _lock:
+        return Config(
+            retries={"mode": _settings["retry_mode"], "total_max_attempts": _settings["max_attempts"]},
+            connect_timeout=_settings["connect_timeout"],
+            read_timeout=_settings["read_timeout"],
+        )
+
+
+def get_breaker(service: str, region: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker of a (service, region), shared by every account."""
+    with _lock:
+        key = (service, region)
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(service, region, _settings["failure_threshold"], _settings["cooldown"])
+        return _breakers[key]
+
+
+def breaker_for(client) -> CircuitBreaker:
+    """Return the circuit breaker of a boto3 client's service and region."""
+    return get_breaker(client.meta.service_model.service_name, client.meta.region_name)
+
+
+def tripped() -> List[CircuitBreaker]:
+    """Return the breakers that opened at least once, for the run summary."""
+    with _lock:
+        return sorted((b for b in _breakers.values() if b.trips), key=lambda b: (b.service, b.region))
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+from hap.aws import is_region_denied
+from hap.profiling import get_profiler
+from hap.resilience import CircuitOpenError, get_breaker, get_setting, is_transient
+
+# service: (paginated operation, result key, record ID field)
+LISTERS = {
+    "lambda": ("list_functions", "Functions", "FunctionName"),
+    "config": ("describe_config_rules", "ConfigRules", "ConfigRuleName"),
+}
+
+# service: fetch the tags of one record. Only called for records that pass every other
+# condition of a rule with a tag condition.
+TAG_FETCHERS = {
+    "lambda": lambda client, record: client.list_tags(Resource=record["FunctionArn"]).get("Tags", {}),
+    "config": lambda client, record: {
+        tag["Key"]: tag["Value"]
+        for tag in client.list_tags_for_resource(ResourceArn=record["ConfigRuleArn"]).get("Tags", [])
+    },
+}
+
+
+def _as_tuple(value) -> tuple:
+    """Accept a single value or a sequence of values."""
+    if value is None:
+        return ()
+    return tuple(value) if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+
+
+class Rule:
+    """
+    A named predicate over the records of one service. Every condition given must hold:
+    suffixes/prefixes/regex test the record ID, fields test record values (any of the listed
+    values; a list field matches if any of its items does) and tags test resource tags (a value of "*" only requires the key). Conditions are
+    compiled once and the cheap ones run first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        service: str,
+        suffixes: Iterable[str] = (),
+        prefixes: Iterable[str] = (),
+        exclude_prefixes: Iterable[str] = (),
+        regex: Optional[str] = None,
+        fields: Optional[Mapping] = None,
+        tags: Optional[Mapping] = None,
+    ) -> None:
+        if service not in LISTERS:
+            raise ValueError(f"Unsupported service for rule {name}: {service}")
+        self.name = name
+        self.service = service
+        self.suffixes = _as_tuple(suffixes)
+        self.prefixes = _as_tuple(prefixes)
+        self.exclude_prefixes = _as_tuple(exclude_prefixes)
+        self.regex = re.compile(regex) if regex else None
+        self.fields = {key: frozenset(_as_tuple(value)) for key, value in (fields or {}).items()}
+        self.tags = {key: value for key, value in (tags or {}).items()}
+
+    @classmethod
+    def from_config(cls, name: str, config: Mapping) -> "Rule":
+        """Build a rule from a `[scan.rules.<name>]` config table."""
+        return cls(
+            name,
+            config["service"],
+            suffixes=config.get("suffixes", config.get("suffix")),
+            prefixes=config.get("prefixes", config.get("prefix")),
+            exclude_prefixes=config.get("exclude_prefixes"),
+            regex=config.get("regex"),
+            fields=config.get("fields"),
+            tags=config.get("tags"),
+        )
+
+    def matches(self, resource_id: str, record: Mapping, get_tags: Callable[[], Mapping]) -> bool:
+        """Return True if the record satisfies every condition of the rule."""
+        if self.suffixes and not resource_id.endswith(self.suffixes):
+            return False
+        if self.prefixes and not resource_id.startswith(self.prefixes):
+            return False
+        if self.exclude_prefixes and resource_id.startswith(self.exclude_prefixes):
+            return False
+        if self.regex and not self.regex.search(resource_id):
+            return False
+        for key, allowed in self.fields.items():
+            value = record.get(key)
+            if isinstance(value, list):
+                # List fields (e.g. Architectures) match if they share any value with the rule
+                if allowed.isdisjoint(item for item in value if not isinstance(item, (dict, list))):
+                    return False
+            elif value not in allowed:
+                return False
+        if self.tags:
+            tags = get_tags()
+            for key, value in self.tags.items():
+                if key not in tags or (value != "*" and tags[key] != value):
+                    return False
+        return True
+
+
+class Scanner:
+    """
+    List resources once per (account, region, service) and evaluate every rule against
+    each record in the same pass. API calls do not grow with the number of rules, apart
+    from tag lookups, which are made at most once per record and only when a tag rule needs them.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules = list(rules)
+        self.services = {}
+        for rule in self.rules:
+            self.services.setdefault(rule.service, []).append(rule)
+        self.profiler = get_profiler()
+
+    def scan_target(self, session, service: str, region: str) -> Dict[str, List[str]]:
+        """
+        List one service in one region and return {rule name: matching resource IDs}.
+        Raises CircuitOpenError without calling AWS while the target's circuit breaker is open.
+        """
+        operation, result_key, id_field = LISTERS[service]
+        rules = self.services[service]
+        matches = {rule.name: [] for rule in rules}
+
+        with get_breaker(service, region).guard(), self.profiler.phase("listing", service=service, region=region):
+            client = session.client(service, region_name=region)
+            for page in client.get_paginator(operation).paginate():
+                for record in page[result_key]:
+                    resource_id = record[id_field]
+                    get_tags = _tag_getter(service, client, record)
+                    for rule in rules:
+                        if rule.matches(resource_id, record, get_tags):
+                            matches[rule.name].append(resource_id)
+        return matches
+
+    def scan_account(
+        self, session, regions: Iterable[str], unavailable: Optional[List[list]] = None
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Scan every (service, region) target of an account concurrently.
+        Returns {rule name: {region: matching resource IDs}}. Regions that turn out not to be
+        enabled or to be denied for the account are left out, marking them as not scanned.
+
+        Targets whose circuit breaker is open are deferred until the rest of the account is
+        done, then retried once the breaker's cooldown has passed so the retry can be its probe.
+        The wait is bounded by the `max_defer_wait` resilience setting. Targets still rejected,
+        throttled or timing out are left out as well and appended to `unavailable` as
+        [service, region, reason].
+        """
+        results = {rule.name: {} for rule in self.rules}
+        unavailable = unavailable if unavailable is not None else []
+        deferred = []
+        with ThreadPoolExecutor() as executor:
+            futures = {
+                executor.submit(self.scan_target, session, service, region): (service, region)
+                for service in self.services
+                for region in regions
+            }
+            for future in as_completed(futures):
+                service, region = futures[future]
+                try:
+                    _merge(results, region, future.result())
+                except CircuitOpenError:
+                    deferred.append((service, region))
+                except Exception as e:
+                    _skip_target(e, service, region, unavailable)
+        deadline = time.monotonic() + get_setting("max_defer_wait")
+        for service, region in deferred:
+            try:
+                _merge(results, region, self._scan_deferred(session, service, region, deadline))
+            except Exception as e:
+                _skip_target(e, service, region, unavailable)
+        return results
+
+    def _scan_deferred(self, session, service: str, region: str, deadline: float) -> Dict[str, List[str]]:
+        """Scan a target whose circuit was open, waiting for its cooldown and probe until the deadline."""
+        while True:
+            try:
+                return self.scan_target(session, service, region)
+            except CircuitOpenError as e:
+                # While another caller's probe is in flight there is no cooldown left, so poll for its outcome
+                wait = e.retry_in if e.retry_in > 0 else 1.0
+                if time.monotonic() + wait > deadline:
+                    raise
+                time.sleep(wait)
+
+
+def _merge(results: Dict[str, Dict[str, List[str]]], region: str, matches: Mapping[str, List[str]]) -> None:
+    """Add the matches of one target to the per-rule results."""
+    for rule_name, resource_ids in matches.items():
+        results[rule_name][region] = resource_ids
+
+
+def _skip_target(error: Exception, service: str, region: str, unavailable: List[list]) -> None:
+    """Leave a failed target out of the results, re-raising errors that are not about the target."""
+    if is_region_denied(error):
+        return
+    if isinstance(error, CircuitOpenError) or is_transient(error):
+        unavailable.append([service, region, str(error)])
+        return
+    raise error
+
+
+def _tag_getter(service: str, client, record: Mapping) -> Callable[[], Mapping]:
+    """Return a callable fetching the record's tags on first use and reusing them afterwards."""
+    cache = {}
+
+    def get_tags() -> Mapping:
+        if "tags" not in cache:
+            cache["tags"] = TAG_FETCHERS[service](client, record)
+        return cache["tags"]
+
+    return get_tags
+
+
+def count_matrix(matches: Mapping[str, Mapping[str, Iterable[str]]]) -> Dict[str, Dict[str, int]]:
+    """Turn {rule: {region: IDs}} into {rule: {region: count}}."""
+    return {
+        rule_name: {region: len(resource_ids) for region, resource_ids in by_region.items()}
+        for rule_name, by_region in matches.items()
+    }
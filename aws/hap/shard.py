@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import json
+import os
+import re
+import uuid
+import zlib
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+_PARTIAL_NAME = "shard-{index}-of-{count}.json"
+_PARTIAL_PATTERN = re.compile(r"shard-(\d+)-of-(\d+)\.json$")
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse an `i/N` shard argument, where 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard {value!r}, expected i/N")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Invalid shard {value!r}, need 0 <= i < N")
+    return index, count
+
+
+def parse_workers(value: str) -> int:
+    """Parse a shard process count, which must be at least 1."""
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid worker count {value!r}, expected an integer")
+    if workers < 1:
+        raise argparse.ArgumentTypeError(f"Invalid worker count {value!r}, need at least 1")
+    return workers
+
+
+def shard_of(key: str, count: int) -> int:
+    """
+    Return the shard a key belongs to.
+    crc32 is stable across processes and hosts (unlike hash()), and an account keeps its
+    shard when other accounts are added or removed.
+    """
+    return zlib.crc32(key.encode("utf-8")) % count
+
+
+def select_shard(keys: Iterable[str], index: int, count: int) -> List[str]:
+    """Return the keys assigned to shard `index` of `count`, in their original order."""
+    return [key for key in keys if shard_of(key, count) == index]
+
+
+def partial_path(directory: str, index: int, count: int) -> str:
+    """Return the partial result file path for a shard."""
+    return os.path.join(directory, _PARTIAL_NAME.format(index=index, count=count))
+
+
+def new_run_id() -> str:
+    """Return an ID shared by every shard of one run, so partials left by earlier runs can be told apart."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def write_partial(
+    directory: str, index: int, count: int, results: list, meta: Optional[dict] = None, run_id: Optional[str] = None
+) -> str:
+    """
+    Write one shard's results. The file is renamed into place, so a merge never reads
+    a half-written shard.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = partial_path(directory, index, count)
+    document = {
+        "shard": index,
+        "count": count,
+        "run_id": run_id,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "meta": meta or {},
+        "results": results,
+    }
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(document, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def load_partials(directory: str, run_id: Optional[str] = None) -> Tuple[int, dict, list, List[int]]:
+    """
+    Load every partial result file of a sharded run.
+    Returns the shard count, the metadata of the first shard, the combined results and
+    the missing shard indexes. With a run ID, partials written by other runs are ignored,
+    so their shards count as missing.
+    """
+    documents = {}
+    counts = set()
+    for path in sorted(glob.glob(os.path.join(directory, "shard-*-of-*.json"))):
+        match = _PARTIAL_PATTERN.search(path)
+        if not match:
+            continue
+        with open(path) as f:
+            document = json.load(f)
+        if run_id and document.get("run_id") != run_id:
+            continue
+        documents[int(match.group(1))] = document
+        counts.add(int(match.group(2)))
+
+    if not documents:
+        raise RuntimeError(f"No shard results found in {directory}" + (f" for run {run_id}" if run_id else ""))
+    if len(counts) > 1:
+        raise RuntimeError(f"Shard results in {directory} come from different shard counts: {sorted(counts)}")
+
+    count = counts.pop()
+    results = [result for index in sorted(documents) for result in documents[index]["results"]]
+    missing = [index for index in range(count) if index not in documents]
+    return count, documents[min(documents)]["meta"], results, missing
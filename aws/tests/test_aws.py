@@ -1,8 +1,11 @@
+import os
+import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
 from botocore.exceptions import BotoCoreError, ClientError
-from hap.aws import AWS
+from hap.aws import AWS, RegionCache, discover_regions, new_session
 
 
 class TestAWS(unittest.TestCase):
@@ -88,5 +91,135 @@ class TestAWS(unittest.TestCase):
             self.aws.perform_service_action("some_action", Param1="value1")
 
 
+class TestSharedCore(unittest.TestCase):
+
+    def test_sessions_share_loader_and_resolver(self):
+        first = new_session(region="us-east-1", aws_access_key_id="AKIA1", aws_secret_access_key="secret1")
+        second = new_session(region="eu-west-1", aws_access_key_id="AKIA2", aws_secret_access_key="secret2")
+
+        self.assertIs(first._loader, second._loader)
+        self.assertIs(
+            first._session._get_internal_component("endpoint_resolver"),
+            second._session._get_internal_component("endpoint_resolver"),
+        )
+        self.assertEqual(first.get_credentials().access_key, "AKIA1")
+        self.assertEqual(second.get_credentials().access_key, "AKIA2")
+        self.assertEqual(second.client("lambda").meta.region_name, "eu-west-1")
+
+    def test_loader_search_paths_do_not_grow(self):
+        search_paths = list(new_session()._loader.search_paths)
+        for _ in range(3):
+            new_session()
+
+        self.assertEqual(new_session()._loader.search_paths, search_paths)
+
+    def test_concurrent_sessions_add_boto3_data_path_once(self):
+        threads = [threading.Thread(target=new_session) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        search_paths = new_session()._loader.search_paths
+        self.assertEqual(len(search_paths), len(set(search_paths)))
+        self.assertTrue(any(path.endswith(os.path.join("boto3", "data")) for path in search_paths))
+
+    def test_assume_role_returns_shared_core_session(self):
+        mock_self = MagicMock()
+        mock_session = MagicMock()
+        mock_session.client.return_value.assume_role.return_value = {
+            "Credentials": {"AccessKeyId": "AKIA3", "SecretAccessKey": "secret3", "SessionToken": "token3"}
+        }
+
+        session = AWS.assume_role(mock_self, "arn:aws:iam::123456789012:role/AWSAFTExecution", session=mock_session)
+
+        mock_session.client.return_value.assume_role.assert_called_once_with(
+            RoleArn="arn:aws:iam::123456789012:role/AWSAFTExecution", RoleSessionName="AWSAFT-Session"
+        )
+        self.assertIs(session._loader, new_session()._loader)
+        self.assertEqual(session.get_credentials().token, "token3")
+
+
+class TestRegionDiscovery(unittest.TestCase):
+
+    def test_discover_regions_from_account_opt_in_status(self):
+        session = MagicMock()
+        session.client.return_value.get_paginator.return_value.paginate.return_value = [
+            {"Regions": [{"RegionName": "us-east-1"}, {"RegionName": "eu-west-1"}]}
+        ]
+
+        self.assertEqual(discover_regions(session), {"us-east-1", "eu-west-1"})
+        session.client.return_value.get_paginator.return_value.paginate.assert_called_once_with(
+            RegionOptStatusContains=["ENABLED", "ENABLED_BY_DEFAULT"]
+        )
+
+    def test_discover_regions_falls_back_to_ec2(self):
+        account_client, ec2_client = MagicMock(), MagicMock()
+        account_client.get_paginator.return_value.paginate.side_effect = ClientError(
+            {"Error": {"Code": "AccessDeniedException", "Message": "denied"}}, "ListRegions"
+        )
+        ec2_client.describe_regions.return_value = {"Regions": [{"RegionName": "us-east-1"}]}
+        session = MagicMock()
+        session.client.side_effect = lambda service, region_name: {"account": account_client, "ec2": ec2_client}[service]
+
+        self.assertEqual(discover_regions(session), {"us-east-1"})
+        ec2_client.describe_regions.assert_called_once_with(AllRegions=False)
+
+    def test_cache_filters_and_reuses_discovery(self):
+        cache = RegionCache()
+        discover = MagicMock(return_value={"us-east-1", "eu-west-1"})
+        regions = ["us-east-1", "ap-south-1", "eu-west-1"]
+
+        self.assertEqual(cache.usable_regions("111111111111", regions, discover), ["us-east-1", "eu-west-1"])
+        cache.mark_denied("111111111111", "eu-west-1")
+        self.assertEqual(cache.usable_regions("111111111111", regions, discover), ["us-east-1"])
+        discover.assert_called_once()
+
+    def test_cache_keeps_all_regions_when_discovery_fails(self):
+        cache = RegionCache()
+
+        self.assertEqual(cache.usable_regions("111111111111", ["us-east-1", "sa-east-1"], lambda: None), ["us-east-1", "sa-east-1"])
+
+    def test_cache_expires(self):
+        cache = RegionCache(ttl=0)
+        discover = MagicMock(return_value={"us-east-1"})
+
+        cache.usable_regions("111111111111", ["us-east-1"], discover)
+        cache.usable_regions("111111111111", ["us-east-1"], discover)
+
+        self.assertEqual(discover.call_count, 2)
+
+    def test_cache_persists_and_merges_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "regions.json")
+            first, second = RegionCache(path), RegionCache(path)
+            first.usable_regions("111111111111", ["us-east-1"], lambda: {"us-east-1"})
+            second.usable_regions("222222222222", ["us-east-1"], lambda: {"eu-west-1"})
+            first.save()
+            second.save()
+
+            discover = MagicMock()
+            reloaded = RegionCache(path)
+            self.assertEqual(reloaded.usable_regions("111111111111", ["us-east-1"], discover), ["us-east-1"])
+            self.assertEqual(reloaded.usable_regions("222222222222", ["us-east-1"], discover), [])
+            discover.assert_not_called()
+
+    def test_concurrent_saves_use_their_own_temporary_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "regions.json")
+            caches = [RegionCache(path) for _ in range(8)]
+            for number, cache in enumerate(caches):
+                cache.usable_regions(f"{number:012d}", ["us-east-1"], lambda: {"us-east-1"})
+
+            threads = [threading.Thread(target=cache.save) for cache in caches]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(os.listdir(tmp), ["regions.json"])
+            self.assertTrue(RegionCache(path).usable_regions("000000000000", ["us-east-1"], MagicMock()))
+
+
 if __name__ == "__main__":
     unittest.main()
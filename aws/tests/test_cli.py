@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from hap import cli
+
+HEAVY_MODULES = {"boto3", "botocore", "rich", "yaml", "requests", "tomli", "hcl2"}
+
+# Cumulative import time budget for `snt --help` and subcommand `--help`, in microseconds.
+HELP_IMPORT_BUDGET_US = 100_000
+
+
+def import_times(code):
+    """Run code under `-X importtime` and return {module: (cumulative microseconds, is top-level import)}."""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(cli.__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name[1:]
+        times[name.strip()] = (int(cumulative), not name.startswith(" "))
+    return times
+
+
+class TestCLI(unittest.TestCase):
+
+    def test_every_command_has_a_script(self):
+        for name, (script, _) in cli.COMMANDS.items():
+            self.assertTrue(os.path.isfile(os.path.join(cli._ROOT, script)), name)
+
+    @patch("hap.cli.os.chdir")
+    @patch("hap.cli.runpy.run_path")
+    def test_main_runs_script_with_remaining_args(self, mock_run_path, mock_chdir):
+        with patch.object(sys, "argv", ["snt"]):
+            cli.main(["find-lambdas", "--profile", "/tmp/run"])
+            argv = sys.argv
+
+        script = os.path.join(cli._ROOT, "aws", "find-lambdas.py")
+        mock_run_path.assert_called_once_with(script, run_name="__main__")
+        mock_chdir.assert_called_once_with(os.path.dirname(script))
+        self.assertEqual(argv, [script, "--profile", "/tmp/run"])
+
+    @patch("hap.cli.runpy.run_path")
+    def test_missing_script_exits_with_message(self, mock_run_path):
+        with patch.object(cli, "_ROOT", "/nonexistent"), patch.object(sys, "argv", ["snt"]):
+            with self.assertRaises(SystemExit) as context:
+                cli.main(["find-lambdas"])
+
+        self.assertIn("SNT_ROOT", str(context.exception.code))
+        mock_run_path.assert_not_called()
+
+    def test_unknown_command_exits(self):
+        with self.assertRaises(SystemExit):
+            cli.main(["nope"])
+
+    def assert_light_startup(self, argv):
+        startup = import_times("pass")
+        times = import_times(f"from hap.cli import main\ntry:\n    main({argv!r})\nexcept SystemExit:\n    pass")
+        added = {name: us for name, us in times.items() if name not in startup}
+
+        self.assertIn("hap.cli", added)
+        self.assertEqual(HEAVY_MODULES & set(added), set())
+        self.assertLess(sum(us for us, top_level in added.values() if top_level), HELP_IMPORT_BUDGET_US)
+
+    def test_help_does_not_import_heavy_dependencies(self):
+        self.assert_light_startup(["--help"])
+
+    def test_subcommand_help_does_not_import_heavy_dependencies(self):
+        for command in ("cleanup-rules", "find-lambdas"):
+            with self.subTest(command=command):
+                self.assert_light_startup([command, "--help"])
+
+
+if __name__ == "__main__":
+    unittest.main()
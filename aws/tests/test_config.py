@@ -0,0 +1,127 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from hap import config
+from hap.base import Base
+
+LOGGING_CONF = """
+[loggers]
+keys=root
+
+[handlers]
+keys=nullHandler
+
+[formatters]
+keys=
+
+[logger_root]
+level=INFO
+handlers=nullHandler
+
+[handler_nullHandler]
+class=NullHandler
+args=()
+"""
+
+
+class TestConfigCache(unittest.TestCase):
+
+    def setUp(self):
+        config.clear_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.tmp.name, "config.toml")
+        self.logging_file = os.path.join(self.tmp.name, "logging.conf")
+        with open(self.logging_file, "w") as f:
+            f.write(LOGGING_CONF)
+        self.write_config('[aws]\nregions = ["us-east-1"]\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_config(self, content):
+        with open(self.config_file, "w") as f:
+            f.write(content)
+        # Move mtime forward explicitly, filesystems with coarse timestamps would hide the edit
+        mtime = time.time() + len(content)
+        os.utime(self.config_file, (mtime, mtime))
+
+    def base(self):
+        return Base(config_file=self.config_file, logging_file=self.logging_file)
+
+    def test_config_parsed_once_and_shared(self):
+        with patch("hap.config.tomli.loads", wraps=config.tomli.loads) as mock_loads:
+            first = self.base()
+            second = self.base()
+            second.reload_config()
+
+        self.assertIs(first.config_data, second.config_data)
+        mock_loads.assert_called_once()
+
+    def test_config_is_read_only(self):
+        data = self.base().config_data
+
+        self.assertEqual(data["aws"]["regions"], ("us-east-1",))
+        with self.assertRaises(TypeError):
+            data["aws"]["regions"] = ["eu-west-1"]
+
+    def test_reload_after_change(self):
+        base = self.base()
+        self.write_config('[aws]\nregions = ["us-east-1", "eu-west-1"]\n')
+
+        base.reload_config()
+
+        self.assertEqual(base.config_data["aws"]["regions"], ("us-east-1", "eu-west-1"))
+
+    def test_touch_without_change_keeps_view(self):
+        base = self.base()
+        data = base.config_data
+        os.utime(self.config_file, (time.time() + 100, time.time() + 100))
+
+        with patch("hap.config.tomli.loads") as mock_loads:
+            base.reload_config()
+
+        self.assertIs(base.config_data, data)
+        mock_loads.assert_not_called()
+
+    def test_missing_file(self):
+        with self.assertRaises(RuntimeError):
+            Base(config_file=os.path.join(self.tmp.name, "missing.toml"), logging_file=self.logging_file)
+
+    def test_watcher_reloads_subscribers(self):
+        base = self.base()
+        watcher = config.ConfigWatcher(os.path.abspath(self.config_file), interval=60)
+        watcher.subscribe(base.reload_config)
+
+        self.write_config('[aws]\nregions = ["sa-east-1"]\n')
+        watcher.check()
+
+        self.assertEqual(base.config_data["aws"]["regions"], ("sa-east-1",))
+
+    def test_watcher_keeps_config_on_parse_error(self):
+        base = self.base()
+        data = base.config_data
+        watcher = config.ConfigWatcher(os.path.abspath(self.config_file), interval=60)
+        watcher.subscribe(base.reload_config)
+
+        self.write_config("[aws\n")
+        watcher.check()
+
+        self.assertIs(base.config_data, data)
+
+    def test_watcher_holds_objects_weakly(self):
+        base = self.base()
+        watcher = config.ConfigWatcher(os.path.abspath(self.config_file), interval=60)
+        watcher.subscribe(base.reload_config)
+        del base
+
+        self.write_config('[aws]\nregions = ["sa-east-1"]\n')
+        watcher.check()
+
+        self.assertEqual(watcher._callbacks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
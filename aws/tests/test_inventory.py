@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from hap.inventory import Inventory
+
+
+class TestInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.inventory = Inventory(os.path.join(self.tmp.name, "inventory.db"))
+        self.first = self.inventory.start_run(label="-common-lambda")
+        self.inventory.record_account(
+            self.first, "111111111111", "lambda", {"us-east-1": ["a", "b"], "eu-west-1": []}, "Example Acc"
+        )
+        self.inventory.record_account(self.first, "222222222222", "lambda", {}, error="AccessDenied")
+        self.second = self.inventory.start_run(label="-common-lambda")
+        self.inventory.record_account(
+            self.second, "111111111111", "lambda", {"us-east-1": ["a"], "eu-west-1": ["c"]}, "Example Acc"
+        )
+        self.inventory.record_account(self.second, "222222222222", "lambda", {"us-east-1": ["z"]}, "Another Acc")
+
+    def tearDown(self):
+        self.inventory.close()
+        self.tmp.cleanup()
+
+    def test_runs(self):
+        runs = self.inventory.runs()
+
+        self.assertEqual([run[0] for run in runs], [self.first, self.second])
+        self.assertEqual(runs[0][2:], ("-common-lambda", 2, 1, 2))
+        self.assertEqual(runs[1][2:], ("-common-lambda", 2, 0, 3))
+
+    def test_runs_count_resources_matched_by_several_rules_once(self):
+        run = self.inventory.start_run()
+        self.inventory.record_account(run, "333333333333", "lambda", {"us-east-1": ["f", "g"]})
+        self.inventory.record_account(run, "333333333333", "python-lambdas", {"us-east-1": ["f", "g"]})
+
+        self.assertEqual(self.inventory.runs()[-1][5], 2)
+
+    def test_resolve_run(self):
+        self.assertEqual(self.inventory.resolve_run(-1), self.second)
+        self.assertEqual(self.inventory.resolve_run(-2), self.first)
+        self.assertEqual(self.inventory.resolve_run(self.first), self.first)
+        with self.assertRaises(RuntimeError):
+            self.inventory.resolve_run(-3)
+
+    def test_diff_ignores_regions_not_scanned_in_both_runs(self):
+        changes = self.inventory.diff(self.first, self.second, "lambda")
+
+        self.assertEqual(changes["added"], [("111111111111", "eu-west-1", "lambda", "c")])
+        self.assertEqual(changes["removed"], [("111111111111", "us-east-1", "lambda", "b")])
+
+    def test_diff_filters_resource_type(self):
+        self.assertEqual(self.inventory.diff(-2, -1, "config-rule"), {"added": [], "removed": []})
+
+    def test_trend_counts_empty_regions(self):
+        self.assertEqual(
+            [(run_id, region, count) for run_id, _, region, count in self.inventory.trend("111111111111")],
+            [(self.first, "eu-west-1", 0), (self.first, "us-east-1", 2), (self.second, "eu-west-1", 1),
+             (self.second, "us-east-1", 1)],
+        )
+
+    def test_trend_uses_account_index(self):
+        plan = self.inventory.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT run_id FROM scanned_regions WHERE account_id = ?", ("111111111111",)
+        ).fetchall()
+
+        self.assertIn("scanned_regions_by_account", " ".join(str(row) for row in plan))
+
+    def test_failed_listing_of_one_service_is_not_scanned(self):
+        first = self.inventory.start_run()
+        self.inventory.record_account(first, "333333333333", "lambda", {"us-east-1": ["f"]})
+        self.inventory.record_account(first, "333333333333", "custom-config-rules", {"us-east-1": ["rule-a", "rule-b"]})
+        second = self.inventory.start_run()
+        self.inventory.record_account(second, "333333333333", "lambda", {"us-east-1": ["f", "g"]})
+        self.inventory.record_account(second, "333333333333", "custom-config-rules", {})  # Config throttled
+
+        self.assertEqual(self.inventory.diff(first, second, "custom-config-rules"), {"added": [], "removed": []})
+        self.assertEqual(
+            self.inventory.diff(first, second, "lambda")["added"], [("333333333333", "us-east-1", "lambda", "g")]
+        )
+        self.assertEqual(
+            [(run_id, region, count) for run_id, _, region, count in self.inventory.trend("333333333333", "custom-config-rules")],
+            [(first, "us-east-1", 2)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
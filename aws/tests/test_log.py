@@ -0,0 +1,132 @@
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import unittest
+
+from hap import log
+from hap.log import JsonFormatter, configure_logging, raise_level_to_handlers
+
+LOGGING_CONF = """
+[loggers]
+keys=root
+
+[handlers]
+keys=fileHandler
+
+[formatters]
+keys=simpleFormatter
+
+[logger_root]
+level=DEBUG
+handlers=fileHandler
+
+[handler_fileHandler]
+class=FileHandler
+level=INFO
+formatter=simpleFormatter
+args=({log_path!r}, 'a')
+
+[formatter_simpleFormatter]
+format=%(levelname)s; %(message)s
+"""
+
+
+class TestLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp.name, "test.log")
+        self.logging_file = os.path.join(self.tmp.name, "logging.conf")
+        with open(self.logging_file, "w") as f:
+            f.write(LOGGING_CONF.format(log_path=self.log_path))
+
+    def tearDown(self):
+        log._stop_listener()
+        log._configured_file = None
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        root.setLevel(logging.WARNING)
+        self.tmp.cleanup()
+
+    def read_log(self):
+        with open(self.log_path) as f:
+            return f.read().splitlines()
+
+    def test_configure_logging_applies_file_once(self):
+        self.assertTrue(configure_logging(self.logging_file))
+        self.assertFalse(configure_logging(self.logging_file))
+        self.assertTrue(configure_logging(self.logging_file, force=True))
+
+    def test_level_raised_to_handlers(self):
+        configure_logging(self.logging_file)
+
+        self.assertEqual(logging.getLogger().level, logging.INFO)
+        self.assertFalse(logging.getLogger("AWS").isEnabledFor(logging.DEBUG))
+
+    def test_raise_level_keeps_stricter_logger_level(self):
+        logger = logging.getLogger("test_raise_level")
+        logger.setLevel(logging.ERROR)
+        handler = logging.NullHandler(level=logging.INFO)
+        logger.addHandler(handler)
+
+        raise_level_to_handlers(logger)
+
+        self.assertEqual(logger.level, logging.ERROR)
+        logger.removeHandler(handler)
+
+    def test_queue_mode_moves_handlers_to_listener(self):
+        configure_logging(self.logging_file, queue_mode=True)
+        root = logging.getLogger()
+
+        self.assertEqual(len(root.handlers), 1)
+        self.assertIsInstance(root.handlers[0], logging.handlers.QueueHandler)
+
+        logger = logging.getLogger("test_queue_mode")
+        logger.info("queued message")
+        logger.debug("suppressed message")
+        log._stop_listener()
+
+        self.assertEqual(self.read_log(), ["INFO; queued message"])
+
+    def test_json_format(self):
+        configure_logging(self.logging_file, json_format=True)
+
+        logging.getLogger("test_json_format").warning("account %s skipped", "123456789012")
+
+        entry = json.loads(self.read_log()[0])
+        self.assertEqual(entry["level"], "WARNING")
+        self.assertEqual(entry["logger"], "test_json_format")
+        self.assertEqual(entry["message"], "account 123456789012 skipped")
+
+    def test_queue_mode_keeps_json_exception_field(self):
+        configure_logging(self.logging_file, queue_mode=True, json_format=True)
+
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("test_queue_json").exception("account %s failed", "123456789012")
+        log._stop_listener()
+
+        entry = json.loads(self.read_log()[0])
+        self.assertEqual(entry["message"], "account 123456789012 failed")
+        self.assertIn("ValueError: boom", entry["exception"])
+
+    def test_json_formatter_includes_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.getLogger("AWS").makeRecord(
+                "AWS", logging.ERROR, __file__, 1, "failed", None, exc_info=sys.exc_info()
+            )
+
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertIn("ValueError: boom", entry["exception"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+from hap.profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler()
+
+        with profiler.phase("listing", region="us-east-1"):
+            pass
+
+        self.assertFalse(profiler.enabled)
+        self.assertEqual(profiler.events, [])
+
+    def test_phase_records_trace_event(self):
+        profiler = Profiler("unused")
+
+        with profiler.phase("listing", region="us-east-1"):
+            pass
+
+        self.assertEqual(len(profiler.events), 1)
+        event = profiler.events[0]
+        self.assertEqual(event["name"], "listing")
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["args"], {"region": "us-east-1"})
+        self.assertGreaterEqual(event["dur"], 0)
+
+    def test_phase_records_event_when_block_raises(self):
+        profiler = Profiler("unused")
+
+        with self.assertRaises(ValueError):
+            with profiler.phase("role_assumption"):
+                raise ValueError("boom")
+
+        self.assertEqual([event["name"] for event in profiler.events], ["role_assumption"])
+
+    def test_stop_writes_profile_and_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = os.path.join(tmp, "run")
+            profiler = Profiler(prefix)
+            profiler.start()
+            with profiler.phase("rendering"):
+                sum(range(1000))
+            profiler.stop()
+
+            self.assertIsInstance(pstats.Stats(f"{prefix}.prof"), pstats.Stats)
+            with open(f"{prefix}.trace.json") as f:
+                trace = json.load(f)
+            self.assertEqual([event["name"] for event in trace["traceEvents"]], ["rendering"])
+
+
+if __name__ == "__main__":
+    unittest.main()
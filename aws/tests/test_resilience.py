@@ -0,0 +1,122 @@
+import unittest
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+from hap import resilience
+from hap.aws import new_session
+from hap.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, get_breaker, is_transient
+
+
+def client_error(code, status=400):
+    return ClientError({"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "Op")
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIsTransient(unittest.TestCase):
+
+    def test_throttles_timeouts_and_server_errors(self):
+        self.assertTrue(is_transient(client_error("ThrottlingException")))
+        self.assertTrue(is_transient(client_error("TooManyRequestsException")))
+        self.assertTrue(is_transient(client_error("SomethingBroke", status=503)))
+        self.assertTrue(is_transient(ReadTimeoutError(endpoint_url="https://lambda.us-east-1.amazonaws.com")))
+
+    def test_other_errors(self):
+        self.assertFalse(is_transient(client_error("AccessDeniedException", status=403)))
+        self.assertFalse(is_transient(ValueError("not AWS")))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("lambda", "eu-west-1", failure_threshold=3, cooldown=30, clock=self.clock)
+
+    def fail(self, error=None):
+        with self.assertRaises(ClientError):
+            with self.breaker.guard():
+                raise error or client_error("ThrottlingException")
+
+    def test_trips_after_consecutive_failures(self):
+        self.fail()
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.fail()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+
+    def test_success_and_non_transient_errors_reset_count(self):
+        self.fail()
+        self.fail()
+        with self.breaker.guard():
+            pass
+        self.fail()
+        self.fail(client_error("AccessDeniedException", status=403))
+        self.fail()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_probe_after_cooldown(self):
+        for _ in range(3):
+            self.fail()
+        self.clock.now = 31
+
+        self.breaker.allow()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()  # Only one probe at a time
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_failed_probe_reopens(self):
+        for _ in range(3):
+            self.fail()
+        self.clock.now = 31
+        self.fail()
+
+        self.assertEqual((self.breaker.state, self.breaker.trips), (OPEN, 2))
+        self.clock.now = 60
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+
+
+class TestSettings(unittest.TestCase):
+
+    def tearDown(self):
+        resilience.reset()
+
+    def test_breakers_shared_per_service_and_region(self):
+        self.assertIs(get_breaker("lambda", "us-east-1"), get_breaker("lambda", "us-east-1"))
+        self.assertIsNot(get_breaker("lambda", "us-east-1"), get_breaker("config", "us-east-1"))
+
+    def test_configure_replaces_breakers(self):
+        breaker = get_breaker("lambda", "us-east-1")
+        resilience.configure(failure_threshold=3)
+        self.assertIs(get_breaker("lambda", "us-east-1"), breaker)
+
+        resilience.configure(failure_threshold=10, cooldown=5)
+        self.assertEqual((get_breaker("lambda", "us-east-1").failure_threshold, get_breaker("lambda", "us-east-1").cooldown), (10, 5))
+
+    def test_unknown_setting(self):
+        with self.assertRaises(ValueError):
+            resilience.configure(retries=3)
+
+    def test_sessions_default_to_adaptive_retries(self):
+        resilience.configure(max_attempts=7, read_timeout=12)
+        client = new_session(region="us-east-1", aws_access_key_id="AKIA", aws_secret_access_key="secret").client("lambda")
+
+        self.assertEqual(client.meta.config.retries["mode"], "adaptive")
+        self.assertEqual(client.meta.config.retries["total_max_attempts"], 7)
+        self.assertEqual(client.meta.config.read_timeout, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import unittest
+from unittest.mock import MagicMock
+
+from botocore.exceptions import ClientError
+from hap import resilience
+from hap.scanner import Rule, Scanner, count_matrix
+
+FUNCTIONS = [
+    {"FunctionName": "app-common-lambda", "FunctionArn": "arn:app", "Runtime": "python3.9", "Architectures": ["arm64"]},
+    {"FunctionName": "jobs-common-lambda", "FunctionArn": "arn:jobs", "Runtime": "nodejs18.x", "Architectures": ["x86_64"]},
+    {"FunctionName": "report-worker", "FunctionArn": "arn:report", "Runtime": "python3.9"},
+]
+TAGS = {"arn:app": {"team": "fiesta"}, "arn:jobs": {}, "arn:report": {"team": "other"}}
+
+
+def fake_session(pages):
+    """Return a session whose clients page through `pages` and count their API calls."""
+    session = MagicMock()
+    client = session.client.return_value
+    client.get_paginator.return_value.paginate.side_effect = lambda: iter(pages)
+    client.list_tags.side_effect = lambda Resource: {"Tags": TAGS[Resource]}
+    return session, client
+
+
+class TestRule(unittest.TestCase):
+
+    def match(self, rule, record):
+        return rule.matches(record["FunctionName"], record, lambda: TAGS[record["FunctionArn"]])
+
+    def test_suffix_and_prefix(self):
+        rule = Rule("common", "lambda", suffixes=["-common-lambda"], prefixes=("app-", "jobs-"))
+        self.assertEqual([self.match(rule, record) for record in FUNCTIONS], [True, True, False])
+
+    def test_exclude_prefixes(self):
+        rule = Rule("not-app", "lambda", exclude_prefixes="app-")
+        self.assertEqual([self.match(rule, record) for record in FUNCTIONS], [False, True, True])
+
+    def test_regex_and_fields(self):
+        rule = Rule("py", "lambda", regex=r"^(app|report)-", fields={"Runtime": ["python3.9", "python3.8"]})
+        self.assertEqual([self.match(rule, record) for record in FUNCTIONS], [True, False, True])
+
+    def test_tags(self):
+        self.assertEqual(
+            [self.match(Rule("fiesta", "lambda", tags={"team": "fiesta"}), record) for record in FUNCTIONS],
+            [True, False, False],
+        )
+        self.assertEqual(
+            [self.match(Rule("tagged", "lambda", tags={"team": "*"}), record) for record in FUNCTIONS],
+            [True, False, True],
+        )
+
+    def test_from_config(self):
+        rule = Rule.from_config("py39", {"service": "lambda", "suffix": "-common-lambda", "fields": {"Runtime": "python3.9"}})
+        self.assertEqual([self.match(rule, record) for record in FUNCTIONS], [True, False, False])
+
+    def test_list_fields(self):
+        rule = Rule.from_config("arm", {"service": "lambda", "fields": {"Architectures": ["arm64"]}})
+        self.assertEqual([self.match(rule, record) for record in FUNCTIONS], [True, False, False])
+
+    def test_unsupported_service(self):
+        with self.assertRaises(ValueError):
+            Rule("buckets", "s3")
+
+
+class TestScanner(unittest.TestCase):
+
+    def test_one_listing_for_all_rules(self):
+        session, client = fake_session([{"Functions": FUNCTIONS[:2]}, {"Functions": FUNCTIONS[2:]}])
+        scanner = Scanner(
+            [
+                Rule("common", "lambda", suffixes="-common-lambda"),
+                Rule("py39", "lambda", fields={"Runtime": "python3.9"}),
+                Rule("worker", "lambda", regex="worker$"),
+            ]
+        )
+
+        matches = scanner.scan_account(session, ["us-east-1", "eu-west-1"])
+
+        self.assertEqual(client.get_paginator.call_count, 2)
+        self.assertEqual(matches["common"]["us-east-1"], ["app-common-lambda", "jobs-common-lambda"])
+        self.assertEqual(matches["py39"]["eu-west-1"], ["app-common-lambda", "report-worker"])
+        self.assertEqual(
+            count_matrix(matches),
+            {
+                "common": {"us-east-1": 2, "eu-west-1": 2},
+                "py39": {"us-east-1": 2, "eu-west-1": 2},
+                "worker": {"us-east-1": 1, "eu-west-1": 1},
+            },
+        )
+        client.list_tags.assert_not_called()
+
+    def test_tags_fetched_once_per_candidate_record(self):
+        session, client = fake_session([{"Functions": FUNCTIONS}])
+        scanner = Scanner(
+            [
+                Rule("fiesta", "lambda", tags={"team": "fiesta"}),
+                Rule("tagged-python", "lambda", fields={"Runtime": "python3.9"}, tags={"team": "*"}),
+            ]
+        )
+
+        matches = scanner.scan_target(session, "lambda", "us-east-1")
+
+        self.assertEqual(matches, {"fiesta": ["app-common-lambda"], "tagged-python": ["app-common-lambda", "report-worker"]})
+        self.assertEqual(client.list_tags.call_count, 3)
+
+    def test_denied_regions_left_out(self):
+        session = MagicMock()
+        denied_client, client = MagicMock(), MagicMock()
+        denied_client.get_paginator.return_value.paginate.side_effect = ClientError(
+            {"Error": {"Code": "UnrecognizedClientException", "Message": "invalid token"}}, "ListFunctions"
+        )
+        client.get_paginator.return_value.paginate.return_value = [{"Functions": FUNCTIONS}]
+        session.client.side_effect = lambda service, region_name: denied_client if region_name == "ap-south-1" else client
+
+        matches = Scanner([Rule("common", "lambda", suffixes="-common-lambda")]).scan_account(
+            session, ["us-east-1", "ap-south-1"]
+        )
+
+        self.assertEqual(matches, {"common": {"us-east-1": ["app-common-lambda", "jobs-common-lambda"]}})
+
+    def test_scp_denied_regions_left_out(self):
+        session = MagicMock()
+        denied_client, client = MagicMock(), MagicMock()
+        denied_client.get_paginator.return_value.paginate.side_effect = ClientError(
+            {
+                "Error": {
+                    "Code": "AccessDeniedException",
+                    "Message": "User: arn:aws:sts::111111111111:assumed-role/AWSAFTExecution/x is not authorized to "
+                    "perform: lambda:ListFunctions with an explicit deny in a service control policy",
+                }
+            },
+            "ListFunctions",
+        )
+        client.get_paginator.return_value.paginate.return_value = [{"Functions": FUNCTIONS}]
+        session.client.side_effect = lambda service, region_name: denied_client if region_name == "sa-east-1" else client
+
+        matches = Scanner([Rule("common", "lambda", suffixes="-common-lambda")]).scan_account(
+            session, ["us-east-1", "sa-east-1"]
+        )
+
+        self.assertEqual(list(matches["common"]), ["us-east-1"])
+
+    def test_access_denied_is_an_error(self):
+        session, client = fake_session([])
+        client.get_paginator.return_value.paginate.side_effect = ClientError(
+            {"Error": {"Code": "AccessDeniedException", "Message": "not authorized to perform lambda:ListFunctions"}},
+            "ListFunctions",
+        )
+
+        with self.assertRaises(ClientError):
+            Scanner([Rule("common", "lambda", suffixes="-common-lambda")]).scan_account(session, ["us-east-1"])
+
+    def test_other_errors_propagate(self):
+        session, client = fake_session([])
+        client.get_paginator.return_value.paginate.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "bad request"}}, "ListFunctions"
+        )
+
+        with self.assertRaises(ClientError):
+            Scanner([Rule("common", "lambda", suffixes="-common-lambda")]).scan_account(session, ["us-east-1"])
+
+    def test_throttled_regions_reported_unavailable(self):
+        self.addCleanup(resilience.reset)
+        resilience.configure(failure_threshold=1, cooldown=60, max_defer_wait=0)
+        session = MagicMock()
+        throttled_client, client = MagicMock(), MagicMock()
+        throttled_client.get_paginator.return_value.paginate.side_effect = ClientError(
+            {"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "ListFunctions"
+        )
+        client.get_paginator.return_value.paginate.return_value = [{"Functions": FUNCTIONS}]
+        session.client.side_effect = lambda service, region_name: throttled_client if region_name == "eu-west-1" else client
+        scanner = Scanner([Rule("common", "lambda", suffixes="-common-lambda")])
+
+        first, second = [], []
+        scanner.scan_account(session, ["us-east-1", "eu-west-1"], first)
+        matches = scanner.scan_account(session, ["us-east-1", "eu-west-1"], second)
+
+        self.assertEqual(list(matches["common"]), ["us-east-1"])
+        self.assertEqual([target[:2] for target in first + second], [["lambda", "eu-west-1"]] * 2)
+        self.assertIn("Circuit open", second[0][2])
+        # The open circuit shed the second account's target without calling AWS
+        self.assertEqual(throttled_client.get_paginator.call_count, 1)
+
+
+    def test_deferred_target_waits_for_probe(self):
+        self.addCleanup(resilience.reset)
+        resilience.configure(failure_threshold=1, cooldown=0.2, max_defer_wait=5)
+        session, client = fake_session([{"Functions": FUNCTIONS}])
+        scanner = Scanner([Rule("common", "lambda", suffixes="-common-lambda")])
+        resilience.get_breaker("lambda", "us-east-1").record_failure()
+
+        unavailable = []
+        matches = scanner.scan_account(session, ["us-east-1"], unavailable)
+
+        self.assertEqual(matches, {"common": {"us-east-1": ["app-common-lambda", "jobs-common-lambda"]}})
+        self.assertEqual(unavailable, [])
+        self.assertEqual(resilience.get_breaker("lambda", "us-east-1").state, resilience.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+import tempfile
+import unittest
+
+from hap.shard import load_partials, parse_shard, parse_workers, partial_path, select_shard, shard_of, write_partial
+
+ACCOUNT_IDS = [f"{number:012d}" for number in range(100)]
+
+
+class TestShard(unittest.TestCase):
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/8"), (2, 8))
+        for value in ("8/8", "-1/4", "1/0", "1", "a/b"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(value)
+
+    def test_parse_workers(self):
+        self.assertEqual(parse_workers("4"), 4)
+        for value in ("0", "-2", "four"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_workers(value)
+
+    def test_shards_partition_accounts(self):
+        shards = [select_shard(ACCOUNT_IDS, index, 4) for index in range(4)]
+
+        self.assertEqual(sorted(account for shard in shards for account in shard), ACCOUNT_IDS)
+        self.assertTrue(all(shards))
+
+    def test_assignment_is_stable_when_accounts_change(self):
+        before = {account: shard_of(account, 4) for account in ACCOUNT_IDS}
+        remaining = ACCOUNT_IDS[10:] + ["999999999999"]
+
+        for index in range(4):
+            self.assertEqual(
+                [account for account in select_shard(remaining, index, 4) if account in before],
+                [account for account in remaining if before.get(account) == index],
+            )
+
+    def test_write_and_load_partials(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_partial(tmp, 0, 3, [{"account_id": "1"}], {"regions": ["us-east-1"]})
+            write_partial(tmp, 2, 3, [{"account_id": "2"}], {"regions": ["us-east-1"]})
+
+            count, meta, results, missing = load_partials(tmp)
+
+            self.assertEqual(count, 3)
+            self.assertEqual(meta, {"regions": ["us-east-1"]})
+            self.assertEqual(results, [{"account_id": "1"}, {"account_id": "2"}])
+            self.assertEqual(missing, [1])
+            self.assertFalse(os.path.exists(f"{partial_path(tmp, 0, 3)}.tmp"))
+
+    def test_load_partials_rejects_mixed_shard_counts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_partial(tmp, 0, 2, [])
+            write_partial(tmp, 0, 3, [])
+
+            with self.assertRaises(RuntimeError):
+                load_partials(tmp)
+
+    def test_load_partials_ignores_other_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_partial(tmp, 0, 2, [{"account_id": "1"}], run_id="current")
+            write_partial(tmp, 1, 2, [{"account_id": "2"}], run_id="last-week")
+
+            count, _, results, missing = load_partials(tmp, "current")
+
+            self.assertEqual((count, results, missing), (2, [{"account_id": "1"}], [1]))
+            with self.assertRaises(RuntimeError):
+                load_partials(tmp, "never-written")
+
+    def test_load_partials_without_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(RuntimeError):
+                load_partials(tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()
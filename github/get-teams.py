@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 from getpass import getpass
 import requests
 import yaml
@@ -22,76 +23,64 @@ headers = {
     'Accept': 'application/vnd.github.v3+json'
 }
 
-# Function to get the list of teams
-def get_teams():
-    teams = []
-    url = teams_url
-    
+# Reuse one connection for every request
+session = requests.Session()
+session.headers.update(headers)
+
+# Generator yielding records page by page with only the requested fields
+def paginate(url, fields):
+    params = {'per_page': 100}
+
     while url:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, params=params)
         response.raise_for_status()
-        teams.extend(response.json())
+        for item in response.json():
+            yield {field: item[field] for field in fields}
+        # The next link already carries the query parameters
         url = response.links.get('next', {}).get('url')
-    
-    return [{'name': team['name'], 'slug': team['slug']} for team in teams]
+        params = None
+
+# Function to get the list of teams
+def get_teams():
+    return paginate(teams_url, ('name', 'slug'))
 
 # Function to get the repositories and roles for a team
 def get_team_repos(team_slug):
     url = f'https://api.github.com/orgs/{GH_ORG}/teams/{team_slug}/repos'
-    repos = []
-    
-    while url:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        repos.extend(response.json())
-        url = response.links.get('next', {}).get('url')
-    
-    return repos
+    return paginate(url, ('full_name', 'permissions'))
 
 # Function to get the maintainers for a team
 def get_team_maintainers(team_slug):
     url = f'https://api.github.com/orgs/{GH_ORG}/teams/{team_slug}/members?role=maintainer'
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return paginate(url, ('login',))
 
 # Function to get all members of a team
 def get_team_members(team_slug):
     url = f'https://api.github.com/orgs/{GH_ORG}/teams/{team_slug}/members'
-    members = []
-    
-    while url:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        members.extend(response.json())
-        url = response.links.get('next', {}).get('url')
-    
-    return members
+    return paginate(url, ('login',))
 
-# Main function to gather data and format it in YAML
-def main():
-    teams = get_teams()
-    data = {}
+# Function to build the YAML entry for a single team in one pass over its repos
+def get_team_data(team_slug):
+    data = {'write': [], 'read': [], 'admin': [], 'repos': []}
+
+    for repo in get_team_repos(team_slug):
+        for role, permission in (('write', 'push'), ('read', 'pull'), ('admin', 'admin')):
+            if repo['permissions'][permission]:
+                data[role].append(repo['full_name'])
+        data['repos'].append(repo['full_name'])
 
-    for team in teams:
+    data['maintainers'] = [maintainer['login'] for maintainer in get_team_maintainers(team_slug)]
+    data['members'] = [member['login'] for member in get_team_members(team_slug)]
+    return data
+
+# Main function to gather data and stream it as YAML, one team at a time
+def main():
+    for team in get_teams():
         # TODO: Add variables for names if this is ever used again.
         if team['name'].startswith('fiesta-aft') or 'fiesta-foundation' in team['name']:
-            repos = get_team_repos(team['slug'])
-            maintainers = get_team_maintainers(team['slug'])
-            members = get_team_members(team['slug'])
-
-            data[team['name']] = {
-                'write': [repo['full_name'] for repo in repos if repo['permissions']['push']],
-                'read': [repo['full_name'] for repo in repos if repo['permissions']['pull']],
-                'admin': [repo['full_name'] for repo in repos if repo['permissions']['admin']],
-                'maintainers': [maintainer['login'] for maintainer in maintainers],
-                'members': [member['login'] for member in members],
-                'repos': [repo['full_name'] for repo in repos]
-            }
-
-    # Convert the data to YAML format
-    yaml_data = yaml.dump(data, default_flow_style=False)
-    print(yaml_data)
+            # Each team is a top-level key, so the dumped documents concatenate into one YAML mapping
+            sys.stdout.write(yaml.dump({team['name']: get_team_data(team['slug'])}, default_flow_style=False))
+            sys.stdout.flush()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()